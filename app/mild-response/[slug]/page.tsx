@@ -2,6 +2,7 @@ import { notFound } from 'next/navigation';
 import type { Metadata } from 'next';
 import Link from 'next/link';
 import { getArticleBySlug, getArticleSlugs, getRelatedArticles, extractFAQs, stripFAQSection } from '@/lib/markdown';
+import { getOgImagePath } from '@/lib/image-manifest';
 import { ArticleSchema } from '@/components/article-schema';
 import { BreadcrumbSchema } from '@/components/breadcrumb-schema';
 import { FAQSchema } from '@/components/faq-schema';
@@ -38,7 +39,7 @@ export async function generateMetadata({
   const { frontmatter } = article;
   const siteUrl = process.env.NEXT_PUBLIC_SITE_URL || 'https://review-safety.com';
   const articleUrl = `${siteUrl}/mild-response/${slug}`;
-  const ogImage = `${siteUrl}/og-default.png`;
+  const ogImage = `${siteUrl}${getOgImagePath('mild-response', slug)}`;
 
   return {
     title: frontmatter.title,
@@ -0,0 +1,104 @@
+import fs from 'fs';
+import path from 'path';
+
+export interface ImageVariant {
+  path: string;
+  bytes: number;
+}
+
+export interface ImageSize {
+  path: string;
+  bytes: number;
+  width: number;
+  height: number;
+  sha256: string;
+  variants?: Partial<Record<'avif' | 'webp' | 'svg', ImageVariant>>;
+}
+
+export interface ImageManifestEntry extends ImageSize {
+  // Downscaled copies (480w, 768w, ...) rendered from the same figure
+  sizes?: ImageSize[];
+  // Ready-made srcset strings per format, including the full-size image
+  srcset?: Partial<Record<'png' | 'avif' | 'webp', string>>;
+}
+
+// Raster formats that can be offered as <source> elements
+const variantTypes = [
+  ['avif', 'image/avif'],
+  ['webp', 'image/webp'],
+] as const;
+
+// Rendered width of the article body: container (max-w-7xl) minus sidebar, gaps and card padding
+const articleImageSizes = '(min-width: 1280px) 810px, (min-width: 1024px) calc(100vw - 470px), calc(100vw - 64px)';
+
+const manifestPath = path.join(process.cwd(), 'data', 'image-manifest.json');
+
+let cachedImages: Record<string, ImageManifestEntry> | null = null;
+
+/**
+ * Load data/image-manifest.json (written by scripts/build_images.py) once per build
+ */
+function loadImages(): Record<string, ImageManifestEntry> {
+  if (cachedImages) {
+    return cachedImages;
+  }
+  try {
+    const manifest = JSON.parse(fs.readFileSync(manifestPath, 'utf8'));
+    cachedImages = manifest.images ?? {};
+  } catch {
+    cachedImages = {};
+  }
+  return cachedImages!;
+}
+
+/**
+ * Get manifest entry for a site URL path such as /bridge/images/foo.png
+ */
+export function getImageInfo(urlPath: string): ImageManifestEntry | null {
+  return loadImages()[urlPath] ?? null;
+}
+
+/**
+ * Add intrinsic width/height to <img> tags that point at generated ./images/*
+ * and wrap them in <picture> with AVIF/WebP sources (smallest full-size file first) when variants exist.
+ * When downscaled sizes exist, srcset/sizes let the browser pick the smallest file that fits.
+ * When an SVG (with embedded subset fonts) was generated, it replaces the raster images.
+ */
+export function addImageDimensions(html: string, category: string): string {
+  return html.replace(
+    /<img src="\.\/images\/([^"]+)"([^>]*)>/g,
+    (match, file: string, rest: string) => {
+      const info = getImageInfo(`/${category}/images/${file}`);
+      if (!info) {
+        return match;
+      }
+      if (info.variants?.svg) {
+        const svgFile = file.replace(/\.png$/, '.svg');
+        return `<img src="./images/${svgFile}" width="${info.width}" height="${info.height}"${rest}>`;
+      }
+      const sizes = info.srcset ? ` sizes="${articleImageSizes}"` : '';
+      const imgSrcset = info.srcset?.png ? ` srcset="${info.srcset.png}"${sizes}` : '';
+      const img = `<img src="./images/${file}"${imgSrcset} width="${info.width}" height="${info.height}"${rest}>`;
+      const base = file.replace(/\.png$/, '');
+      // Browsers take the first supported <source>, so list the measured smallest file first
+      const sources = variantTypes
+        .filter(([format]) => info.variants?.[format])
+        .sort(([a], [b]) => info.variants![a]!.bytes - info.variants![b]!.bytes)
+        .map(([format, type]) => {
+          const srcset = info.srcset?.[format] ?? `./images/${base}.${format}`;
+          return `<source type="${type}" srcset="${srcset}"${info.srcset?.[format] ? sizes : ''}>`;
+        })
+        .join('');
+      return sources ? `<picture>${sources}${img}</picture>` : img;
+    }
+  );
+}
+
+/**
+ * Site URL path of the article's OG card (scripts/generate_og_images.py),
+ * falling back to the shared default image when none was generated
+ */
+export function getOgImagePath(category: string, slug: string): string {
+  const urlPath = `/og/${category}/${slug}.png`;
+  return getImageInfo(urlPath) ? urlPath : '/og-default.png';
+}
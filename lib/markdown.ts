@@ -5,6 +5,7 @@ import { remark } from 'remark';
 import remarkGfm from 'remark-gfm';
 import remarkHtml from 'remark-html';
 import remarkInternalLinks from './remark-internal-links';
+import { addImageDimensions } from './image-manifest';
 
 export interface HowToStep {
   name: string;
@@ -114,9 +115,8 @@ export async function getArticleBySlug(
       .use(remarkInternalLinks, { currentUrl, maxLinks: 5 })
       .use(remarkHtml)
       .process(content);
-    // Add lazy loading and async decoding to images
-    const htmlContent = processedContent
-      .toString()
+    // Add intrinsic size (from data/image-manifest.json), lazy loading and async decoding to images
+    const htmlContent = addImageDimensions(processedContent.toString(), category)
       .replace(/<img /g, '<img loading="lazy" decoding="async" ');
 
     return {
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+画像生成関数のベンチマーク
+- 生成関数ごとに warm（読み込み済みのプロセスで繰り返し実行）と
+  cold（毎回新しいプロセスで matplotlib の import から実行）を計測
+- 壁時計時間・CPU時間・最大 RSS・出力バイト数を記録（時間は中央値）
+- 保存したベースラインと比較し、しきい値（%）を超えて悪化した生成関数があれば失敗（終了コード 1）
+  ベースラインは scripts/benchmarks/baseline.json に保存し、リポジトリにコミットして CI と共有する
+  （マシンごとの基準を使うときは --baseline で指定。CPU数の違う基準と比べると警告を出し、
+  出力形式・layout・計測回数の違う基準とは比較しない）
+- 出力は一時ディレクトリに書くので public/ やマニフェストには影響しない
+
+使い方（リポジトリ直下で実行）:
+    python scripts/benchmark_images.py                     # 計測してベースラインと比較
+    python scripts/benchmark_images.py checklist -n 5      # 名前で絞り込み、warm を5回
+    python scripts/benchmark_images.py --update-baseline   # 今回の結果をベースラインとして保存
+    python scripts/benchmark_images.py --baseline ci-baseline.json   # 別のベースラインと比較
+    python scripts/benchmark_images.py --compare-layout    # layout=tight と fixed の warm の時間を比較
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import image_manifest
+from build_images import DEFAULT_FORMATS, DEFAULT_TIMEOUT, LAYOUT_MODES, ROOT_DIR, resolve_formats
+from image_registry import discover_jobs, filter_jobs, job_label
+
+RESULTS_PATH = ROOT_DIR / '.cache' / 'image-benchmark.json'
+# .cache/ は git の管理外なので、ベースラインはリポジトリで管理する場所に置く
+BASELINE_PATH = ROOT_DIR / 'scripts' / 'benchmarks' / 'baseline.json'
+BENCHMARK_VERSION = 1
+
+DEFAULT_RUNS = 3
+DEFAULT_COLD_RUNS = 2
+DEFAULT_THRESHOLD = 20.0
+
+# ベースラインと一致していないと比較できない計測条件
+COMPARED_SETTINGS = ('formats', 'layout', 'runs', 'cold_runs')
+
+# 比較する指標（時間はこの秒数未満の差を誤差として無視する）
+METRICS = ('wall', 'cpu', 'max_rss_kb', 'bytes')
+MIN_TIME_DELTA = 0.02
+
+
+# ---------------------------------------------------------------------------
+# 計測用の子プロセス
+# ---------------------------------------------------------------------------
+
+def _output_bytes(outputs, root):
+    """出力した全ファイル（PNG・各形式・縮小版）の合計バイト数"""
+    return sum((Path(root) / path).stat().st_size
+               for info in outputs for path in image_manifest.output_files(info))
+
+
+def run_worker(label, runs, warmup, output_options):
+    """子プロセス内で1つの生成関数を runs 回実行し、計測値を返す"""
+    from build_images import _init_worker, _run_job
+
+    _init_worker(output_options)
+    job = next(job for job in discover_jobs() if job_label(job) == label)
+    samples = []
+    for i in range(warmup + runs):
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        # 生成関数の「✓ 保存」表示は計測結果の JSON と混ざらないよう捨てる
+        with contextlib.redirect_stdout(io.StringIO()):
+            ok, _, error, outputs, metrics = _run_job(job, DEFAULT_TIMEOUT)
+        sample = {
+            'wall': time.perf_counter() - wall_start,
+            'cpu': time.process_time() - cpu_start,
+            'phases': metrics['phases'],
+        }
+        if not ok:
+            return {'ok': False, 'error': error}
+        if i >= warmup:
+            samples.append(sample)
+    return {
+        'ok': True,
+        'samples': samples,
+        'max_rss_kb': metrics['max_rss_kb'],
+        'bytes': _output_bytes(outputs, output_options['output_root']),
+    }
+
+
+def _spawn(label, runs, warmup, output_options):
+    """計測用の子プロセスを起動し、(子の結果, 壁時計時間, CPU時間) を返す"""
+    command = [sys.executable, str(Path(__file__).resolve()), '--worker', label,
+               '--runs', str(runs), '--warmup', str(warmup), '--options', json.dumps(output_options)]
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    start = time.perf_counter()
+    proc = subprocess.run(command, cwd=ROOT_DIR, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+    if proc.returncode != 0:
+        error = (proc.stderr.strip().splitlines() or ['異常終了'])[-1]
+        return {'ok': False, 'error': error}, wall, cpu
+    return json.loads(proc.stdout.strip().splitlines()[-1]), wall, cpu
+
+
+# ---------------------------------------------------------------------------
+# 親プロセス側
+# ---------------------------------------------------------------------------
+
+def benchmark_job(job, runs, cold_runs, output_options):
+    """1つの生成関数の warm / cold の計測結果"""
+    label = job_label(job)
+    result = {}
+
+    if runs:
+        # warm: 1プロセスで読み込み・1回目の描画（フォントのキャッシュ作成など）を済ませてから計測
+        child, _, _ = _spawn(label, runs, 1, output_options)
+        if not child['ok']:
+            return {'ok': False, 'error': child['error']}
+        result['warm'] = {
+            'wall': statistics.median(s['wall'] for s in child['samples']),
+            'cpu': statistics.median(s['cpu'] for s in child['samples']),
+            'max_rss_kb': child['max_rss_kb'],
+            'bytes': child['bytes'],
+            'phases': {name: round(statistics.median(s['phases'][name] for s in child['samples']), 4)
+                       for name in child['samples'][0]['phases']},
+        }
+
+    if cold_runs:
+        # cold: Python の起動と matplotlib・日本語フォントの読み込みを含めたプロセス全体
+        walls, cpus, rss, size = [], [], 0, 0
+        for _ in range(cold_runs):
+            child, wall, cpu = _spawn(label, 1, 0, output_options)
+            if not child['ok']:
+                return {'ok': False, 'error': child['error']}
+            walls.append(wall)
+            cpus.append(cpu)
+            rss = max(rss, child['max_rss_kb'])
+            size = child['bytes']
+        result['cold'] = {
+            'wall': statistics.median(walls),
+            'cpu': statistics.median(cpus),
+            'max_rss_kb': rss,
+            'bytes': size,
+        }
+
+    for mode in ('warm', 'cold'):
+        if mode in result:
+            for key in ('wall', 'cpu'):
+                result[mode][key] = round(result[mode][key], 4)
+    return dict(result, ok=True)
+
+
+def compare(results, baseline, threshold):
+    """ベースラインよりしきい値を超えて悪化した項目を (ラベル, モード, 指標, 基準値, 今回) で返す"""
+    regressions = []
+    for label, result in sorted(results.items()):
+        base = baseline.get(label)
+        if not result.get('ok') or not base or not base.get('ok'):
+            continue
+        for mode in ('warm', 'cold'):
+            if mode not in result or mode not in base:
+                continue
+            for metric in METRICS:
+                old, new = base[mode].get(metric), result[mode].get(metric)
+                if not old or new is None:
+                    continue
+                if metric in ('wall', 'cpu') and new - old < MIN_TIME_DELTA:
+                    continue
+                if new > old * (1 + threshold / 100):
+                    regressions.append((label, mode, metric, old, new))
+    return regressions
+
+
+def load_results(path):
+    try:
+        data = json.loads(Path(path).read_text(encoding='utf-8'))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if data.get('version') != BENCHMARK_VERSION:
+        return None
+    return data
+
+
+def save_results(path, data):
+    text = json.dumps(data, ensure_ascii=False, indent=2) + '\n'
+    image_manifest.atomic_write(path, text.encode('utf-8'))
+
+
+def _format_value(metric, value):
+    if metric in ('wall', 'cpu'):
+        return f'{value:.3f}秒'
+    if metric == 'max_rss_kb':
+        return f'{value / 1024:.0f}MB'
+    return f'{value / 1024:.1f}KB'
+
+
+def print_table(results):
+    """生成関数ごとの計測結果を表示"""
+    print()
+    print(f"{'生成関数':<70} {'warm':>9} {'cold':>9} {'RSS':>7} {'出力':>9}")
+    for label, result in sorted(results.items()):
+        if not result.get('ok'):
+            print(f'✗ {label}: {result.get("error")}')
+            continue
+        warm, cold = result.get('warm', {}), result.get('cold', {})
+        measured = warm or cold
+        print(f"  {label:<68} {warm.get('wall', 0):>8.3f}s {cold.get('wall', 0):>8.3f}s"
+              f" {measured['max_rss_kb'] / 1024:>5.0f}MB {measured['bytes'] / 1024:>7.1f}KB")
+
+
+def compare_layouts(jobs, runs, output_options):
+    """layout の設定ごとに warm を計測し、生成関数ごとの時間の差を表示する"""
+    results = {}
+    for layout in LAYOUT_MODES:
+        options = dict(output_options, layout=layout)
+        for job in jobs:
+            result = benchmark_job(job, runs, 0, options)
+            results.setdefault(job_label(job), {})[layout] = result
+            print(f"{'✓' if result['ok'] else '✗'} [{layout}] {job_label(job)}")
+
+    old, new = 'tight', 'fixed'
+    print()
+    print(f"{'生成関数':<70} {old:>9} {new:>9} {'差':>9} {'配置':>8} {'描画':>8}")
+    saved = []
+    for label, result in sorted(results.items()):
+        if not all(r['ok'] for r in result.values()):
+            print(f'✗ {label}: {next(r["error"] for r in result.values() if not r["ok"])}')
+            continue
+        before, after = result[old]['warm'], result[new]['warm']
+        delta = after['wall'] - before['wall']
+        phase_delta = {name: after['phases'][name] - before['phases'][name] for name in ('tight_layout', 'draw')}
+        saved.append((-delta, -sum(phase_delta.values())))
+        print(f"  {label:<68} {before['wall']:>8.3f}s {after['wall']:>8.3f}s {delta:>+8.3f}s"
+              f" {phase_delta['tight_layout']:>+7.3f}s {phase_delta['draw']:>+7.3f}s")
+    if saved:
+        # 全体の時間はエンコードのばらつきを含むので、配置 + 描画のフェーズの差も別に示す
+        wall, phases = zip(*saved)
+        print(f'\n1枚あたりの短縮（{len(saved)}件）: 全体 平均 {statistics.mean(wall):+.3f}秒 /'
+              f' 配置 + 描画 平均 {statistics.mean(phases):+.3f}秒（最大 {max(phases):+.3f}秒）')
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='画像生成関数のベンチマーク（warm / cold）')
+    parser.add_argument('patterns', nargs='*', help='対象を絞り込む文字列（関数名・スクリプト名の部分一致）')
+    parser.add_argument('-n', '--runs', type=int, default=DEFAULT_RUNS,
+                        help=f'warm の計測回数（既定: {DEFAULT_RUNS}、0 で warm を省略）')
+    parser.add_argument('--cold-runs', type=int, default=DEFAULT_COLD_RUNS,
+                        help=f'cold の計測回数（既定: {DEFAULT_COLD_RUNS}、0 で cold を省略）')
+    parser.add_argument('--formats', default=DEFAULT_FORMATS,
+                        help=f'出力形式（カンマ区切り、既定: {DEFAULT_FORMATS}）')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'悪化とみなす増加率（%%、既定: {DEFAULT_THRESHOLD}）')
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PATH,
+                        help=f'比較するベースライン（既定: {BASELINE_PATH.relative_to(ROOT_DIR)}）')
+    parser.add_argument('--output', type=Path, default=RESULTS_PATH,
+                        help=f'計測結果の出力先（既定: {RESULTS_PATH.relative_to(ROOT_DIR)}）')
+    parser.add_argument('--update-baseline', action='store_true', help='今回の結果をベースラインとして保存')
+    parser.add_argument('--layout', choices=LAYOUT_MODES, default=LAYOUT_MODES[0],
+                        help=f'図の配置方法（既定: {LAYOUT_MODES[0]}）')
+    parser.add_argument('--compare-layout', action='store_true',
+                        help='layout=tight と fixed の warm の時間を生成関数ごとに比較して終了')
+    # 子プロセス用（内部で使用）
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('--warmup', type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument('--options', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.runs, args.warmup, json.loads(args.options))))
+        return 0
+
+    jobs = filter_jobs(discover_jobs(), args.patterns)
+    if not jobs:
+        print('対象の生成関数が見つかりませんでした')
+        return 1
+
+    with tempfile.TemporaryDirectory(prefix='image-benchmark-') as output_root:
+        output_options = {'formats': resolve_formats(args.formats), 'output_root': output_root,
+                          'layout': args.layout}
+        if args.compare_layout:
+            print(f'layout の比較中（{len(jobs)}件、warm {args.runs}回）...')
+            compare_layouts(jobs, args.runs, output_options)
+            return 0
+        print(f'ベンチマーク中（{len(jobs)}件、warm {args.runs}回 / cold {args.cold_runs}回）...')
+        results = {}
+        for job in jobs:
+            label = job_label(job)
+            results[label] = benchmark_job(job, args.runs, args.cold_runs, output_options)
+            mark = '✓' if results[label]['ok'] else '✗'
+            print(f'{mark} {label}')
+
+    data = {
+        'version': BENCHMARK_VERSION,
+        'runs': args.runs,
+        'cold_runs': args.cold_runs,
+        'formats': output_options['formats'],
+        'layout': args.layout,
+        'cpu_count': os.cpu_count(),
+        'results': results,
+    }
+    save_results(args.output, data)
+    print_table(results)
+
+    failed = [label for label, r in results.items() if not r['ok']]
+    if args.update_baseline:
+        save_results(args.baseline, data)
+        print(f'\n✅ ベースラインを更新しました: {args.baseline}')
+        return 1 if failed else 0
+
+    baseline = load_results(args.baseline)
+    if baseline is None:
+        print(f'\nベースラインがありません（--update-baseline で {args.baseline} に保存できます）')
+        return 1 if failed else 0
+
+    mismatched = [key for key in COMPARED_SETTINGS if baseline.get(key) != data[key]]
+    if mismatched:
+        print('\n※ ベースラインと計測条件が違うため比較しません'
+              f"（{'、'.join(f'{key}: {baseline.get(key)} → {data[key]}' for key in mismatched)}）")
+        return 1 if failed else 0
+    if baseline.get('cpu_count') != os.cpu_count():
+        print(f"\n※ ベースラインは CPU数 {baseline.get('cpu_count')} のマシンで計測されています"
+              f"（このマシンは {os.cpu_count()}）。時間の比較は参考値です")
+    regressions = compare(results, baseline['results'], args.threshold)
+    print()
+    if regressions:
+        print(f'【{args.threshold:g}% を超えて悪化した項目】')
+        for label, mode, metric, old, new in regressions:
+            print(f'✗ {label} [{mode}] {metric}: {_format_value(metric, old)} → {_format_value(metric, new)}'
+                  f' （+{new / old - 1:.0%}）')
+    else:
+        print(f'✅ ベースラインからの悪化なし（しきい値 {args.threshold:g}%）')
+    return 1 if regressions or failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
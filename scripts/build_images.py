@@ -0,0 +1,629 @@
+#!/usr/bin/env python3
+"""
+画像生成スクリプトの一括実行ランナー
+- generate_*.py の create_* 関数と、定義ファイル（checklists/*.json など）を自動検出（image_registry）
+  一覧表示・キャッシュ判定では matplotlib を読み込まない
+- CPUコア数に合わせたプロセスプールで並列実行
+  （--threads: 1プロセス内のスレッドプールで実行。ワーカーの起動・モジュールの重複読み込みが無い）
+- ジョブごとのタイムアウトと成功・失敗のサマリー表示
+- 内容ハッシュのキャッシュで、変更のない画像は再生成しない（--force で無効化）
+- PNG は減色・アルファ除去・最大圧縮で最適化し、最適化前後のサイズを表示（--no-optimize で無効化）
+- 図は1回だけ描画し、PNG / WebP / AVIF を並列にエンコード（--formats で指定）
+- 同じ描画から 480 / 768 / 1200 / 2000px 幅の縮小版も出力し、srcset をマニフェストに記録
+  （--widths で指定、--widths '' で無効化）
+- ジョブごとのフェーズ別時間（import / build / tight_layout / draw / encode / write）・
+  最大 RSS・アーティスト数を計測し、実行ごとに JSON レポートを出力（--report、--tracemalloc）
+- --watch: scripts/ と定義ファイルを監視し、キャッシュキーが変わった画像だけを
+  読み込み済みのプロセスで再生成（変更したモジュールだけ importlib.reload）
+- --svg: サブセット化した日本語フォントを埋め込んだ SVG も出力
+- 出力は public/<カテゴリ>/images/ にアトミックに書き込み、data/image-manifest.json
+  （パス・バイト数・ピクセルサイズ・ハッシュ）を更新
+- --referenced: 記事（content/**/*.md）から参照されている画像だけを生成し、
+  どの生成関数も出力しない参照を一覧表示
+
+使い方（リポジトリ直下で実行）:
+    python scripts/build_images.py              # すべて生成
+    python scripts/build_images.py checklist    # 名前に "checklist" を含むものだけ
+    python scripts/build_images.py --list       # 生成対象の一覧
+    python scripts/build_images.py --referenced # 記事で使われている画像だけ
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import re
+import signal
+import sys
+import threading
+import time
+import traceback
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import image_cache
+import image_manifest
+import image_metrics
+from image_optimize import DEFAULT_MAX_ERROR, available_formats, format_bytes
+from image_registry import SPEC_GENERATORS, discover_jobs, filter_jobs, image_key, job_label
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+ROOT_DIR = SCRIPTS_DIR.parent
+CONTENT_DIR = ROOT_DIR / 'content'
+REPORT_PATH = ROOT_DIR / '.cache' / 'image-build-report.json'
+REPORT_VERSION = 1
+
+DEFAULT_TIMEOUT = 120
+WATCH_INTERVAL = 0.5
+DEFAULT_FORMATS = 'png,webp,avif'
+# 図の配置方法（image_output の layout 設定。fixed: 軸の無い図は決まった余白で1回だけ配置）
+LAYOUT_MODES = ('fixed', 'tight')
+
+# 記事中の画像参照: ![alt](./images/xxx.png)
+IMAGE_REF_PATTERN = re.compile(r'!\[[^\]]*\]\((?:\./)?images/([^)\s]+)\)')
+
+ImageRef = namedtuple('ImageRef', ['article', 'key'])
+# metrics は image_metrics.finish_job の計測値（ワーカーが異常終了した場合は None）
+Result = namedtuple('Result', ['job', 'ok', 'elapsed', 'error', 'outputs', 'metrics'], defaults=(None,))
+
+
+def scan_image_references(content_dir=CONTENT_DIR):
+    """記事中の ./images/*.png 参照をすべて列挙"""
+    refs = []
+    for article in sorted(content_dir.glob('*/*.md')):
+        text = article.read_text(encoding='utf-8')
+        for name in IMAGE_REF_PATTERN.findall(text):
+            refs.append(ImageRef(str(article.relative_to(ROOT_DIR)), f'{article.parent.name}/images/{name}'))
+    return refs
+
+
+def resolve_references(jobs, refs):
+    """参照画像を生成するジョブと、どのジョブも生成しない参照に分ける"""
+    producers = {image_key(output): job for job in jobs for output in job.outputs}
+    needed = []
+    unresolved = []
+    for ref in refs:
+        job = producers.get(ref.key)
+        if job is None:
+            unresolved.append(ref)
+        elif job not in needed:
+            needed.append(job)
+    return needed, unresolved
+
+
+def print_unresolved(unresolved):
+    """生成関数が見つからない参照を記事ごとに表示"""
+    if not unresolved:
+        return
+    print()
+    print(f'【生成関数が見つからない画像参照: {len(unresolved)}件】')
+    by_article = {}
+    for ref in unresolved:
+        by_article.setdefault(ref.article, []).append(ref.key)
+    for article, keys in by_article.items():
+        print(f'  {article}')
+        for key in keys:
+            print(f'    - {key}')
+
+
+# ---------------------------------------------------------------------------
+# ワーカープロセス側
+# ---------------------------------------------------------------------------
+
+_loaded_modules = {}
+
+
+def _init_worker(output_options, trace_memory=False):
+    """ワーカー起動時に matplotlib と日本語フォント（image_fonts）を1度だけ読み込む
+
+    バックエンドは Agg に固定する（画面の有無を調べない）。生成スクリプトは pyplot を使わないので、
+    pyplot も読み込まない。
+    """
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    os.chdir(ROOT_DIR)
+    if trace_memory:
+        import tracemalloc
+        tracemalloc.start()
+
+    os.environ['MPLBACKEND'] = 'Agg'
+    import matplotlib
+    matplotlib.use('Agg')
+    from image_fonts import setup_fonts
+    setup_fonts()
+
+    import image_output
+    image_output.configure(**output_options)
+
+
+def _load_module(name):
+    """スクリプトを読み込み、モジュール読み込み時に設定された rcParams を記録する
+
+    各スクリプトはモジュールレベルで rcParams を書き換える（font.size が 9 と 10 で異なる）ため、
+    同じワーカーで複数スクリプトを実行しても互いの設定が混ざらないようにする。
+    """
+    if name not in _loaded_modules:
+        import matplotlib
+        with matplotlib.rc_context():
+            module = importlib.import_module(name)
+            rc = matplotlib.rcParams.copy()
+        _loaded_modules[name] = (module, rc)
+    return _loaded_modules[name]
+
+
+class RcGate:
+    """スレッドプールで、rcParams が同じジョブだけを同時に実行させる
+
+    rcParams はプロセスに1つしかなく、matplotlib はアーティストの作成時と描画時にこれを読む。
+    スクリプトごとの rcParams（_load_module で記録したもの）を最初のジョブが適用し、
+    同じスクリプトのジョブはそのまま並行して実行する。別のスクリプトのジョブは、
+    実行中のジョブがすべて終わって rcParams が元に戻るまで待つ。
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._module = None
+        self._running = 0
+        self._saved = None
+
+    @contextmanager
+    def use(self, module, rc):
+        import matplotlib
+
+        with self._condition:
+            self._condition.wait_for(lambda: self._running == 0 or self._module == module)
+            if self._running == 0:
+                self._saved = matplotlib.rcParams.copy()
+                dict.update(matplotlib.rcParams, rc)
+                self._module = module
+            self._running += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._running -= 1
+                if self._running == 0:
+                    dict.update(matplotlib.rcParams, self._saved)
+                    self._module = self._saved = None
+                    self._condition.notify_all()
+
+
+@contextmanager
+def _module_rc(module, rc, gate=None):
+    """スクリプトの rcParams を適用する（gate があればスレッド間で共有する）"""
+    if gate is not None:
+        with gate.use(module, rc):
+            yield
+        return
+    import matplotlib
+    with matplotlib.rc_context():
+        dict.update(matplotlib.rcParams, rc)
+        yield
+
+
+def _on_timeout(signum, frame):
+    raise TimeoutError('タイムアウトしました')
+
+
+def _run_job(job, timeout, gate=None):
+    """1つの生成関数を実行（ワーカープロセス内）
+
+    gate（RcGate）を渡すとスレッドプールの1スレッドとして実行する。
+    タイムアウトはシグナルを使うので、メインスレッド以外では効かない。
+    """
+    import text_metrics
+    from image_output import close_all_figures, pop_saved_outputs
+
+    pop_saved_outputs()
+    image_metrics.start_job()
+    start = time.perf_counter()
+    run_start = None
+    use_alarm = (timeout and hasattr(signal, 'setitimer')
+                 and threading.current_thread() is threading.main_thread())
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _on_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        with image_metrics.phase('import'):
+            module, rc = _load_module(job.module)
+        run_start = time.perf_counter()
+        with _module_rc(job.module, rc, gate):
+            args = [ROOT_DIR / job.spec] if job.spec else []
+            getattr(module, job.function)(*args)
+        ok, error = True, None
+    except Exception as e:
+        ok, error = False, f'{type(e).__name__}: {e}\n{traceback.format_exc()}'
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        # 失敗したジョブの図が残らないようにする（pyplot で図を作るスクリプトの場合）
+        close_all_figures()
+        # 新しく測った文字列の寸法を保存（ワーカーは atexit が呼ばれずに終了するため）
+        text_metrics.save()
+    end = time.perf_counter()
+    metrics = image_metrics.finish_job(end - run_start if run_start is not None else 0.0)
+    return ok, end - start, error, pop_saved_outputs(), metrics
+
+
+# ---------------------------------------------------------------------------
+# 親プロセス側
+# ---------------------------------------------------------------------------
+
+def run_jobs(jobs, workers=None, timeout=DEFAULT_TIMEOUT, output_options=None, trace_memory=False):
+    """ジョブをプロセスプールで並列実行し、Result のリストを返す"""
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(jobs)))
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(output_options or {}, trace_memory)) as pool:
+        futures = {pool.submit(_run_job, job, timeout): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                results.append(Result(job, *future.result()))
+            except Exception as e:
+                # ワーカー自体が異常終了した場合
+                results.append(Result(job, False, 0.0, f'{type(e).__name__}: {e}', []))
+    return results
+
+
+def run_jobs_threaded(jobs, workers=None, output_options=None, trace_memory=False):
+    """ジョブをこのプロセス内のスレッドプールで並列実行し、Result のリストを返す
+
+    図はスレッドごとに別々の Figure で、PNG などのエンコードは GIL を解放するので、
+    プロセスを起動せずに描画とエンコードを重ねられる。rcParams の異なるスクリプトどうしは
+    同時に実行しない（RcGate）ので、ジョブはスクリプトごとにまとめて投入する。
+    ジョブごとのタイムアウトは効かない。
+    """
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(jobs)))
+    _init_worker(output_options or {}, trace_memory)
+    results = []
+    runnable = []
+    for job in sorted(jobs, key=lambda job: job.module):
+        # 読み込み時に rcParams を書き換えるので、スクリプトはメインスレッドで先に読み込む
+        try:
+            _load_module(job.module)
+        except Exception as e:
+            results.append(Result(job, False, 0.0, f'{type(e).__name__}: {e}\n{traceback.format_exc()}', []))
+            continue
+        runnable.append(job)
+
+    gate = RcGate()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_run_job, job, None, gate): job for job in runnable}
+        for future in as_completed(futures):
+            results.append(Result(futures[future], *future.result()))
+    return results
+
+
+def split_fresh_jobs(jobs, entries, force=False, output_options=None):
+    """キャッシュと照合し、(再生成が必要なジョブ, スキップするジョブ, キー) に分ける"""
+    keys = {job: image_cache.job_key(job.module, job.function, job.spec, output_options) for job in jobs}
+    if force:
+        return list(jobs), [], keys
+    stale = [job for job in jobs if not image_cache.is_fresh(entries, job_label(job), keys[job])]
+    fresh = [job for job in jobs if job not in stale]
+    return stale, fresh, keys
+
+
+def write_manifest(results, all_jobs):
+    """今回の生成結果と既存の出力ファイルから data/image-manifest.json を更新"""
+    images = image_manifest.load_manifest()
+    described = [info for r in results if r.ok for info in r.outputs]
+    known_outputs = [output for job in all_jobs for output in job.outputs]
+    image_manifest.update_manifest(images, described, known_outputs)
+    image_manifest.save_manifest(images)
+
+
+def write_report(path, results, skipped, total_elapsed, workers, output_options, executor='processes'):
+    """実行ごとの計測レポート（JSON）を書き出す"""
+    jobs = []
+    for r in sorted(results, key=lambda r: job_label(r.job)):
+        jobs.append({
+            'label': job_label(r.job),
+            'module': r.job.module,
+            'function': r.job.function,
+            'spec': r.job.spec,
+            'ok': r.ok,
+            'elapsed': round(r.elapsed, 4),
+            'error': r.error.splitlines()[0] if r.error else None,
+            'outputs': [{'path': info['path'], 'bytes': info['bytes'], 'width': info['width'],
+                         'height': info['height']} for info in r.outputs],
+            **(r.metrics or {}),
+        })
+    phase_totals = dict.fromkeys(image_metrics.PHASES, 0.0)
+    for job in jobs:
+        for name, elapsed in job.get('phases', {}).items():
+            phase_totals[name] = phase_totals.get(name, 0.0) + elapsed
+    report = {
+        'version': REPORT_VERSION,
+        'started_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'total_elapsed': round(total_elapsed, 3),
+        'workers': workers,
+        'executor': executor,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'options': output_options,
+        'phase_totals': {k: round(v, 4) for k, v in phase_totals.items()},
+        'jobs': jobs,
+        'skipped': sorted(job_label(job) for job in skipped),
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2) + '\n'
+    image_manifest.atomic_write(path, text.encode('utf-8'))
+
+
+def _watched_files():
+    """監視対象（scripts/*.py と定義ファイル）の更新時刻"""
+    files = list(SCRIPTS_DIR.glob('*.py'))
+    for _, _, pattern in SPEC_GENERATORS:
+        files += SCRIPTS_DIR.glob(pattern)
+    return {path: path.stat().st_mtime_ns for path in files if path.is_file()}
+
+
+def _reload_modules(changed, output_options):
+    """変更されたスクリプトと、それを import している読み込み済みのスクリプトを再読み込み
+
+    依存先から順に reload するので、from image_output import save_figure のような
+    参照も新しい関数に置き換わる。
+    """
+    import matplotlib
+
+    loaded = [name for name in list(sys.modules) if (SCRIPTS_DIR / f'{name}.py').is_file()]
+    affected = [name for name in loaded
+                if name in changed or changed & set(image_cache.local_dependencies(name))]
+    # 依存先は依存元より必ず依存モジュール数が少ない
+    for name in sorted(affected, key=lambda n: len(image_cache.local_dependencies(n))):
+        if name in _loaded_modules:
+            with matplotlib.rc_context():
+                module = importlib.reload(sys.modules[name])
+                _loaded_modules[name] = (module, matplotlib.rcParams.copy())
+        else:
+            importlib.reload(sys.modules[name])
+    if 'image_output' in affected:
+        sys.modules['image_output'].configure(**output_options)
+    return affected
+
+
+def _watch_cycle(patterns, entries, output_options, timeout):
+    """古くなった画像を読み込み済みのプロセスで順に再生成する"""
+    all_jobs = discover_jobs()
+    jobs = filter_jobs(all_jobs, patterns)
+    stale, fresh, keys = split_fresh_jobs(jobs, entries, output_options=output_options)
+    if not stale:
+        print(f'影響する画像はありません（{len(fresh)}件は最新）')
+        return
+    start = time.perf_counter()
+    results = []
+    for job in stale:
+        results.append(Result(job, *_run_job(job, timeout)))
+        r = results[-1]
+        if r.ok:
+            files = [path for info in r.outputs for path in image_manifest.output_files(info)]
+            image_cache.record(entries, job_label(job), keys[job], files)
+            print(f'  ✓ {job_label(job)} ({r.elapsed:.2f}秒)')
+        else:
+            print(f'  ✗ {job_label(job)}')
+            print('    ' + r.error.rstrip().replace('\n', '\n    '))
+    image_cache.save_cache(entries)
+    write_manifest(results, all_jobs)
+    print(f'{len(stale)}件を再生成（{time.perf_counter() - start:.2f}秒）')
+
+
+def watch(patterns, output_options, timeout=DEFAULT_TIMEOUT, interval=WATCH_INTERVAL):
+    """ファイルの変更を監視し、影響する画像だけを再生成し続ける（Ctrl+C で終了）"""
+    _init_worker(output_options)
+    entries = image_cache.load_cache()
+    snapshot = _watched_files()
+    _watch_cycle(patterns, entries, output_options, timeout)
+    print(f'変更を監視中（{interval}秒ごと、Ctrl+C で終了）...')
+    try:
+        while True:
+            time.sleep(interval)
+            current = _watched_files()
+            changed = [path for path in current.keys() | snapshot.keys()
+                       if current.get(path) != snapshot.get(path)]
+            if not changed:
+                continue
+            snapshot = current
+            print()
+            print('変更: ' + ', '.join(sorted(str(p.relative_to(SCRIPTS_DIR)) for p in changed)))
+            try:
+                image_cache.clear_index()
+                reloaded = _reload_modules({p.stem for p in changed if p.suffix == '.py'}, output_options)
+                if reloaded:
+                    print('再読み込み: ' + ', '.join(sorted(reloaded)))
+                _watch_cycle(patterns, entries, output_options, timeout)
+            except Exception as e:
+                # 編集途中の構文エラーなどでは監視を続ける
+                print(f'✗ {type(e).__name__}: {e}')
+    except KeyboardInterrupt:
+        print()
+        print('監視を終了しました')
+
+
+def resolve_formats(spec):
+    """--formats の指定から、この環境でエンコードできる形式だけを残す（PNG は常に出力）"""
+    requested = [f.strip().lower() for f in spec.split(',') if f.strip()]
+    available = available_formats()
+    missing = [f for f in requested if f not in available]
+    if missing:
+        print(f"※ この環境では {', '.join(missing)} を出力できないため省略します")
+    return ['png'] + [f for f in requested if f in available and f != 'png']
+
+
+def build_output_options(formats=DEFAULT_FORMATS, widths=None, optimize=True, max_error=DEFAULT_MAX_ERROR,
+                         svg=False, layout=LAYOUT_MODES[0]):
+    """ビルドの出力設定（引数を省略すると build_images.py を既定の引数で実行したときと同じ）"""
+    return {'optimize': optimize, 'max_error': max_error, 'formats': resolve_formats(formats),
+            'widths': list(image_manifest.RESPONSIVE_WIDTHS) if widths is None else widths,
+            'svg': svg, 'layout': layout, 'prune': True}
+
+
+def parse_widths(spec):
+    """--widths の指定（カンマ区切りの px）を整数のリストに"""
+    try:
+        widths = sorted({int(w) for w in spec.split(',') if w.strip()})
+    except ValueError:
+        widths = [0]
+    if any(w <= 0 for w in widths):
+        raise argparse.ArgumentTypeError(f'幅は正の整数で指定してください: {spec}')
+    return widths
+
+
+def print_size_report(results):
+    """最適化前後のファイルサイズを表示"""
+    outputs = [info for r in results if r.ok for info in r.outputs if 'raw_bytes' in info['stats']]
+    if not outputs:
+        return
+    print()
+    print('【サイズレポート（最適化前 → 最適化後）】')
+    for info in sorted(outputs, key=lambda i: i['path']):
+        stats = info['stats']
+        ratio = 1 - info['bytes'] / stats['raw_bytes']
+        mode = f"パレット化 誤差{stats['error']}" if stats.get('paletted') else 'ロスレス'
+        variants = ''.join(f" / {fmt} {format_bytes(v['bytes'])}" for fmt, v in info.get('variants', {}).items())
+        print(f"  {info['path']}: {format_bytes(stats['raw_bytes'])} → {format_bytes(info['bytes'])}"
+              f" （-{ratio:.0%}、{mode}）{variants}")
+    raw_total = sum(info['stats']['raw_bytes'] for info in outputs)
+    total = sum(info['bytes'] for info in outputs)
+    print(f'  合計: {format_bytes(raw_total)} → {format_bytes(total)} （-{1 - total / raw_total:.0%}）')
+    for fmt in image_manifest.VARIANT_FORMATS:
+        sizes = [info['variants'][fmt]['bytes'] for info in outputs if fmt in info.get('variants', {})]
+        if sizes:
+            fonts = sum(info['stats'].get('svg_font_bytes', 0) for info in outputs) if fmt == 'svg' else 0
+            note = f'、うち埋め込みフォント {format_bytes(fonts)}' if fonts else ''
+            print(f'  {fmt} 合計: {format_bytes(sum(sizes))}（{len(sizes)}件{note}）')
+
+    # レスポンシブ版: 幅ごとに各形式の合計（原寸との比較）
+    by_width = {}
+    for info in outputs:
+        for size in info.get('sizes', []):
+            totals = by_width.setdefault(size['width'], {'png': [0, 0]})
+            totals['png'][0] += size['bytes']
+            totals['png'][1] += info['bytes']
+            for fmt, variant in size.get('variants', {}).items():
+                if fmt in info.get('variants', {}):
+                    total = totals.setdefault(fmt, [0, 0])
+                    total[0] += variant['bytes']
+                    total[1] += info['variants'][fmt]['bytes']
+    for width, totals in sorted(by_width.items()):
+        parts = [f'{fmt} {format_bytes(small)}（原寸の{small / full:.0%}）' for fmt, (small, full) in totals.items()]
+        print(f"  {width}w 合計: {' / '.join(parts)}")
+
+
+def print_summary(results, total_elapsed, skipped=()):
+    """成功・失敗のサマリーを表示"""
+    succeeded = [r for r in results if r.ok]
+    failed = [r for r in results if not r.ok]
+
+    print()
+    print('=' * 60)
+    print(f'成功: {len(succeeded)}件 / 失敗: {len(failed)}件 / スキップ（変更なし）: {len(skipped)}件'
+          f' / 合計時間: {total_elapsed:.1f}秒')
+    print('=' * 60)
+    for r in sorted(results, key=lambda r: job_label(r.job)):
+        mark = '✓' if r.ok else '✗'
+        print(f'{mark} {job_label(r.job)} ({r.elapsed:.2f}秒)')
+    if failed:
+        print()
+        print('【失敗したジョブ】')
+        for r in failed:
+            print(f'✗ {job_label(r.job)}')
+            print('  ' + r.error.rstrip().replace('\n', '\n  '))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='画像生成スクリプトを並列で一括実行します')
+    parser.add_argument('patterns', nargs='*', help='対象を絞り込む文字列（関数名・スクリプト名の部分一致）')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='並列数（既定: CPUコア数）')
+    parser.add_argument('--threads', action='store_true',
+                        help='プロセスプールの代わりにこのプロセス内のスレッドプールで実行（タイムアウトは無効）')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help=f'1ジョブあたりのタイムアウト秒数（既定: {DEFAULT_TIMEOUT}）')
+    parser.add_argument('--force', action='store_true', help='キャッシュを無視してすべて再生成')
+    parser.add_argument('--formats', default=DEFAULT_FORMATS,
+                        help=f'出力形式（カンマ区切り、既定: {DEFAULT_FORMATS}。未対応の形式は省略）')
+    parser.add_argument('--widths', type=parse_widths, default=list(image_manifest.RESPONSIVE_WIDTHS),
+                        help='レスポンシブ版の幅（px、カンマ区切り。空文字で出力しない）')
+    parser.add_argument('--svg', action='store_true',
+                        help='使用文字だけのサブセットフォントを埋め込んだ SVG も出力')
+    parser.add_argument('--no-optimize', action='store_true', help='PNG の減色・再圧縮を行わない')
+    parser.add_argument('--layout', choices=LAYOUT_MODES, default=LAYOUT_MODES[0],
+                        help='fixed: 軸の無い図は tight_layout・切り抜きを省く（既定）/ tight: すべて tight_layout')
+    parser.add_argument('--max-error', type=float, default=DEFAULT_MAX_ERROR,
+                        help=f'減色を許容する RMS 誤差の上限（0〜255、既定: {DEFAULT_MAX_ERROR}）')
+    parser.add_argument('--referenced', action='store_true',
+                        help='記事から参照されている画像だけを生成し、未対応の参照を報告')
+    parser.add_argument('--report', type=Path, default=REPORT_PATH,
+                        help=f'計測レポート（JSON）の出力先（既定: {REPORT_PATH.relative_to(ROOT_DIR)}）')
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help='tracemalloc でジョブごとの Python ヒープのピークも計測（遅くなる）')
+    parser.add_argument('--watch', action='store_true',
+                        help='ファイルの変更を監視し、影響する画像だけを再生成し続ける')
+    parser.add_argument('--list', action='store_true', help='生成対象の一覧を表示して終了')
+    args = parser.parse_args(argv)
+
+    all_jobs = discover_jobs()
+    jobs = filter_jobs(all_jobs, args.patterns)
+    unresolved = []
+    if args.referenced:
+        refs = scan_image_references()
+        jobs, unresolved = resolve_references(jobs, refs)
+        print(f'記事の画像参照: {len(refs)}件 / 生成関数あり: {len(refs) - len(unresolved)}件'
+              f' / 生成関数なし: {len(unresolved)}件')
+
+    if args.list:
+        for job in jobs:
+            print(f"{job_label(job)}  [{job.category or '-'}] {job.doc}")
+        return 0
+
+    if not jobs:
+        print('対象の生成関数が見つかりませんでした')
+        print_unresolved(unresolved)
+        return 0 if args.referenced else 1
+
+    start = time.perf_counter()
+    entries = image_cache.load_cache()
+    output_options = build_output_options(args.formats, args.widths, not args.no_optimize, args.max_error,
+                                          args.svg, args.layout)
+    if args.watch:
+        watch(args.patterns, output_options, timeout=args.timeout)
+        return 0
+    stale, fresh, keys = split_fresh_jobs(jobs, entries, force=args.force, output_options=output_options)
+    workers = args.jobs or os.cpu_count() or 1
+    if not stale:
+        write_manifest([], all_jobs)
+        write_report(args.report, [], fresh, time.perf_counter() - start, workers, output_options)
+        print(f'すべての画像が最新です（{len(fresh)}件）')
+        print_unresolved(unresolved)
+        return 0
+
+    print(f'画像を生成中（{len(stale)}件、変更なし {len(fresh)}件はスキップ）...')
+    if args.threads:
+        results = run_jobs_threaded(stale, workers=workers, output_options=output_options,
+                                    trace_memory=args.tracemalloc)
+    else:
+        results = run_jobs(stale, workers=workers, timeout=args.timeout, output_options=output_options,
+                           trace_memory=args.tracemalloc)
+    for r in results:
+        if r.ok and r.outputs:
+            files = [path for info in r.outputs for path in image_manifest.output_files(info)]
+            image_cache.record(entries, job_label(r.job), keys[r.job], files)
+    image_cache.save_cache(entries)
+    write_manifest(results, all_jobs)
+    print_size_report(results)
+    total_elapsed = time.perf_counter() - start
+    write_report(args.report, results, fresh, total_elapsed, workers, output_options,
+                 executor='threads' if args.threads else 'processes')
+    print_summary(results, total_elapsed, skipped=fresh)
+    print(f'計測レポート: {args.report}')
+    print_unresolved(unresolved)
+
+    return 0 if all(r.ok for r in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
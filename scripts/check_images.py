@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+生成画像の重なり・はみ出しの自動検出（目視レビューの代わり）
+- 生成関数を読み込み済みのプロセスで順に実行し、save_figure で描画した直後の図を調べる
+  （configure(render_only=True) なのでエンコード・書き込みはしない）
+- 表示される Text と、枠になるパッチ（Rectangle / FancyBboxPatch / PatchCollection の各パス）の
+  描画範囲（ピクセル）を集め、x 方向の sweep line で範囲が交わる組だけを調べる
+  （x 方向に重なっている要素を y の区間木で持ち、y も重なる要素だけを取り出す。
+  O((n + k) log n)、k は交わる組の数。左揃えで縦に並んだ文字でも全組み合わせを比べない）
+- 検出する問題:
+    overlap  文字どうしの重なり、凡例の枠に隠れた文字
+    overflow 文字の中心を含む枠（いちばん小さいもの）から文字がはみ出している
+    clipped  切り抜かずに保存する図で、文字が図の外にはみ出して欠けている
+- 結果を JSON レポートに書き出し、問題が1件でもあれば終了コード 1（CI 用）
+
+座標は図全体のピクセル座標（左上が原点、切り抜き前）。
+
+使い方（リポジトリ直下で実行）:
+    python scripts/check_images.py              # すべての生成関数
+    python scripts/check_images.py checklist    # 名前に "checklist" を含むものだけ
+"""
+import argparse
+import contextlib
+import heapq
+import io
+import json
+import math
+import sys
+import time
+from bisect import bisect_left
+from datetime import datetime, timezone
+from pathlib import Path
+
+import image_manifest
+from build_images import DEFAULT_TIMEOUT, ROOT_DIR, _init_worker, _run_job
+from image_registry import discover_jobs, filter_jobs, job_label
+
+REPORT_PATH = ROOT_DIR / '.cache' / 'image-layout-report.json'
+REPORT_VERSION = 1
+
+# この幅（px、150dpi で約0.2pt）以下の重なり・はみ出しは誤差として無視する
+DEFAULT_TOLERANCE = 1.0
+
+# 問題の種類（表示順）
+ISSUE_KINDS = ('overlap', 'overflow', 'clipped')
+
+
+# ---------------------------------------------------------------------------
+# 図から描画範囲を集める
+# ---------------------------------------------------------------------------
+
+def _axis_texts(axis):
+    """表示範囲内の目盛りラベルと軸ラベル（描画された分だけ）"""
+    low, high = sorted(axis.get_view_interval())
+    span = (high - low) * 1e-6
+    texts = [axis.label, axis.get_offset_text()]
+    for tick in axis.get_major_ticks():
+        if low - span <= tick.get_loc() <= high + span:
+            texts += [tick.label1, tick.label2]
+    return texts
+
+
+def drawn_texts(fig):
+    """図の中で表示される（空でない）Text をすべて列挙"""
+    from matplotlib.text import Text
+
+    texts = []
+    for child in fig.get_children():
+        if not child.get_visible() or child is fig.patch:
+            continue
+        if child not in fig.axes:
+            texts += child.findobj(Text, include_self=True)
+            continue
+        axes = {getattr(child, name, None) for name in ('xaxis', 'yaxis', 'zaxis')} - {None}
+        for ax_child in child.get_children():
+            if not ax_child.get_visible():
+                continue
+            if ax_child in axes:
+                if child.axison:
+                    texts += _axis_texts(ax_child)
+            else:
+                texts += ax_child.findobj(Text, include_self=True)
+    return [text for text in texts if text.get_visible() and str(text.get_text()).strip()]
+
+
+def legend_boxes(fig):
+    """凡例の枠の描画範囲と、凡例に含まれる Text"""
+    legends = [ax.get_legend() for ax in fig.axes if ax.get_visible()] + list(fig.legends)
+    boxes, members = [], set()
+    for legend in legends:
+        if legend is not None and legend.get_visible():
+            boxes.append(legend.get_frame().get_window_extent())
+            members.update(legend.get_texts() + [legend.get_title()])
+    return boxes, members
+
+
+def container_boxes(fig):
+    """文字を囲む枠になりうるパッチの描画範囲（Bbox）
+
+    矢印・円グラフの扇形などは外接矩形が枠にならないので含めない。
+    """
+    from matplotlib.collections import PatchCollection
+    from matplotlib.patches import FancyBboxPatch, Rectangle
+
+    boxes = []
+    for ax in fig.axes:
+        if not ax.get_visible():
+            continue
+        for patch in ax.patches:
+            if patch.get_visible() and isinstance(patch, (Rectangle, FancyBboxPatch)):
+                boxes.append(patch.get_window_extent())
+        for collection in ax.collections:
+            if collection.get_visible() and isinstance(collection, PatchCollection):
+                transform = collection.get_transform()
+                boxes += [path.get_extents(transform) for path in collection.get_paths()]
+    return boxes
+
+
+# ---------------------------------------------------------------------------
+# sweep line
+# ---------------------------------------------------------------------------
+
+class ActiveIntervals:
+    """sweep line のアクティブ集合。y 方向の範囲が重なる要素だけを O(log n + k) で列挙する
+
+    全要素を y0 の順に並べ、その位置に対するセグメント木に「アクティブな要素の y1 の最大値」を持つ。
+    y0 が相手の y1 より小さい範囲（二分探索）のうち、y1 の最大値が相手の y0 を超える部分木だけをたどる。
+    """
+
+    def __init__(self, boxes):
+        self.order = sorted(range(len(boxes)), key=lambda index: boxes[index][1])
+        self.position = {index: position for position, index in enumerate(self.order)}
+        self.starts = [boxes[index][1] for index in self.order]
+        self.ends = [boxes[index][3] for index in self.order]
+        self.size = 1
+        while self.size < len(boxes):
+            self.size *= 2
+        self.tree = [-math.inf] * (2 * self.size)
+
+    def _set(self, position, value):
+        node = position + self.size
+        self.tree[node] = value
+        node //= 2
+        while node:
+            self.tree[node] = max(self.tree[2 * node], self.tree[2 * node + 1])
+            node //= 2
+
+    def add(self, index):
+        position = self.position[index]
+        self._set(position, self.ends[position])
+
+    def remove(self, index):
+        self._set(self.position[index], -math.inf)
+
+    def overlapping(self, y0, y1, tolerance=0.0):
+        """y0 < 要素の y1 - tolerance かつ 要素の y0 < y1 - tolerance を満たすアクティブな要素"""
+        limit = bisect_left(self.starts, y1 - tolerance)
+        stack = [(1, 0, self.size)]
+        while stack:
+            node, low, high = stack.pop()
+            if low >= limit or self.tree[node] <= y0 + tolerance:
+                continue
+            if node >= self.size:
+                yield self.order[node - self.size]
+                continue
+            middle = (low + high) // 2
+            stack.append((2 * node + 1, middle, high))
+            stack.append((2 * node, low, middle))
+
+
+def intersecting_pairs(boxes, others=None, tolerance=0.0):
+    """範囲が tolerance より大きく交わる組 (i, j) を列挙する
+
+    boxes は (x0, y0, x1, y1) のリスト。others を省略すると boxes どうし（i < j）、
+    指定すると boxes[i] と others[j] の組。x0 の順に走査し、x 方向にまだ重なっている要素だけを
+    アクティブ集合（ActiveIntervals）に残す（抜ける要素は x1 のヒープから取り出す）。
+    幅か高さが tolerance 以下の要素は何とも交わらないので、最初に除く。
+    """
+    groups = [boxes] if others is None else [boxes, others]
+    events = sorted((box[0], side, index) for side, group in enumerate(groups) for index, box in enumerate(group)
+                    if box[2] - box[0] > tolerance and box[3] - box[1] > tolerance)
+    active = [ActiveIntervals(group) for group in groups]
+    ending = [[] for _ in groups]
+    for x, side, index in events:
+        for group_active, heap in zip(active, ending):
+            while heap and heap[0][0] <= x + tolerance:
+                group_active.remove(heapq.heappop(heap)[1])
+        x0, y0, x1, y1 = groups[side][index]
+        other_side = 0 if others is None else 1 - side
+        found = []
+        for other_index in active[other_side].overlapping(y0, y1, tolerance):
+            _, oy0, ox1, oy1 = groups[other_side][other_index]
+            if min(x1, ox1) - x > tolerance and min(y1, oy1) - max(y0, oy0) > tolerance:
+                found.append(other_index)
+        # 同じ入力なら常に同じ順序で返す（要素の番号順）
+        for other_index in sorted(found):
+            if others is None:
+                yield min(index, other_index), max(index, other_index)
+            else:
+                yield (other_index, index) if side == 1 else (index, other_index)
+        active[side].add(index)
+        heapq.heappush(ending[side], (x1, index))
+
+
+# ---------------------------------------------------------------------------
+# 検査
+# ---------------------------------------------------------------------------
+
+def _label(text, limit=40):
+    text = ' '.join(str(text.get_text()).split())
+    return text if len(text) <= limit else text[:limit - 1] + '…'
+
+
+def find_issues(fig, crop=True, tolerance=DEFAULT_TOLERANCE):
+    """描画済みの図の重なり・はみ出しを調べる。(問題のリスト, 文字数, 枠の数)"""
+    renderer = fig.canvas.get_renderer()
+    height = fig.bbox.height
+    texts = drawn_texts(fig)
+    text_boxes = [tuple(map(float, text.get_window_extent(renderer).extents)) for text in texts]
+    boxes = [tuple(map(float, box.extents)) for box in container_boxes(fig)]
+    legends, legend_texts = legend_boxes(fig)
+    legends = [tuple(map(float, box.extents)) for box in legends]
+
+    def pixels(box):
+        x0, y0, x1, y1 = box
+        return [round(x0, 1), round(height - y1, 1), round(x1, 1), round(height - y0, 1)]
+
+    issues = []
+    for i, j in intersecting_pairs(text_boxes, tolerance=tolerance):
+        issues.append({'kind': 'overlap', 'text': _label(texts[i]), 'other': _label(texts[j]),
+                       'bbox': pixels(text_boxes[i]), 'other_bbox': pixels(text_boxes[j])})
+    for i, j in intersecting_pairs(text_boxes, legends, tolerance):
+        if texts[i] not in legend_texts:
+            issues.append({'kind': 'overlap', 'text': _label(texts[i]), 'other': '（凡例）',
+                           'bbox': pixels(text_boxes[i]), 'other_bbox': pixels(legends[j])})
+
+    # 文字の中心を含む枠のうち最も小さいものを、その文字の枠とみなす
+    containers = {}
+    for i, j in intersecting_pairs(text_boxes, boxes, tolerance):
+        x0, y0, x1, y1 = text_boxes[i]
+        bx0, by0, bx1, by1 = boxes[j]
+        if bx0 <= (x0 + x1) / 2 <= bx1 and by0 <= (y0 + y1) / 2 <= by1:
+            area = (bx1 - bx0) * (by1 - by0)
+            if i not in containers or area < containers[i][0]:
+                containers[i] = (area, j)
+    for i, (_, j) in sorted(containers.items()):
+        x0, y0, x1, y1 = text_boxes[i]
+        bx0, by0, bx1, by1 = boxes[j]
+        amount = max(bx0 - x0, x1 - bx1, by0 - y0, y1 - by1)
+        if amount > tolerance:
+            issues.append({'kind': 'overflow', 'text': _label(texts[i]), 'bbox': pixels(text_boxes[i]),
+                           'container': pixels(boxes[j]), 'amount': round(amount, 1)})
+
+    if not crop:
+        width = fig.bbox.width
+        for text, (x0, y0, x1, y1) in zip(texts, text_boxes):
+            amount = max(-x0, x1 - width, -y0, y1 - height)
+            if amount > tolerance:
+                issues.append({'kind': 'clipped', 'text': _label(text), 'bbox': pixels((x0, y0, x1, y1)),
+                               'amount': round(amount, 1)})
+    return issues, len(texts), len(boxes)
+
+
+class FigureChecker:
+    """image_output の inspector として、保存される図を順に検査して結果をためる"""
+
+    def __init__(self, tolerance=DEFAULT_TOLERANCE):
+        self.tolerance = tolerance
+        self.figures = []
+        self.elapsed = 0.0
+
+    def __call__(self, fig, output_path, crop):
+        start = time.perf_counter()
+        issues, texts, boxes = find_issues(fig, crop, self.tolerance)
+        elapsed = time.perf_counter() - start
+        self.elapsed += elapsed
+        self.figures.append({'path': str(output_path), 'texts': texts, 'boxes': boxes,
+                             'elapsed': round(elapsed, 4), 'issues': issues})
+
+    def pop_figures(self):
+        figures, self.figures = self.figures, []
+        return figures
+
+
+def check_jobs(jobs, tolerance=DEFAULT_TOLERANCE, timeout=DEFAULT_TIMEOUT):
+    """生成関数を順に実行して図を検査し、ジョブごとの結果のリストを返す"""
+    import image_output
+
+    _init_worker({'formats': ['png'], 'widths': [], 'optimize': False, 'svg': False, 'render_only': True})
+    checker = FigureChecker(tolerance)
+    image_output.add_inspector(checker)
+    results = []
+    try:
+        for job in jobs:
+            # 生成関数の「✓ 保存」表示は出さない
+            with contextlib.redirect_stdout(io.StringIO()):
+                ok, elapsed, error, _, _ = _run_job(job, timeout)
+            figures = checker.pop_figures()
+            results.append({
+                'label': job_label(job),
+                'ok': ok,
+                'elapsed': round(elapsed, 4),
+                'check_elapsed': round(sum(f['elapsed'] for f in figures), 4),
+                'error': error.splitlines()[0] if error else None,
+                'figures': figures,
+            })
+    finally:
+        image_output.remove_inspector(checker)
+    return results
+
+
+def count_issues(results):
+    """種類ごとの問題の件数"""
+    counts = dict.fromkeys(ISSUE_KINDS, 0)
+    for result in results:
+        for figure in result['figures']:
+            for issue in figure['issues']:
+                counts[issue['kind']] += 1
+    return counts
+
+
+def write_report(path, results, total_elapsed, tolerance):
+    report = {
+        'version': REPORT_VERSION,
+        'started_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'total_elapsed': round(total_elapsed, 3),
+        'tolerance': tolerance,
+        'counts': count_issues(results),
+        'jobs': results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2) + '\n'
+    image_manifest.atomic_write(path, text.encode('utf-8'))
+
+
+def _describe(issue):
+    if issue['kind'] == 'overlap':
+        return f"文字の重なり: 「{issue['text']}」と「{issue['other']}」"
+    if issue['kind'] == 'overflow':
+        return f"枠からのはみ出し（{issue['amount']}px）: 「{issue['text']}」"
+    return f"図の外にはみ出し（{issue['amount']}px）: 「{issue['text']}」"
+
+
+def print_results(results):
+    """ジョブごとの検査結果を表示"""
+    for result in results:
+        if not result['ok']:
+            print(f"✗ {result['label']}: 実行に失敗（{result['error']}）")
+            continue
+        issues = [(figure['path'], issue) for figure in result['figures'] for issue in figure['issues']]
+        texts = sum(figure['texts'] for figure in result['figures'])
+        summary = f"{len(result['figures'])}枚、文字 {texts}件、検査 {result['check_elapsed'] * 1000:.1f}ms"
+        if not issues:
+            print(f"✓ {result['label']}（{summary}）")
+            continue
+        print(f"✗ {result['label']}（{summary}）")
+        for path, issue in issues:
+            print(f"    {Path(path).name}: {_describe(issue)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='生成画像の文字の重なり・はみ出しを検出します')
+    parser.add_argument('patterns', nargs='*', help='対象を絞り込む文字列（関数名・スクリプト名の部分一致）')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f'無視する重なり・はみ出しの幅（px、既定: {DEFAULT_TOLERANCE}）')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help=f'1ジョブあたりのタイムアウト秒数（既定: {DEFAULT_TIMEOUT}）')
+    parser.add_argument('--report', type=Path, default=REPORT_PATH,
+                        help=f'検査レポート（JSON）の出力先（既定: {REPORT_PATH.relative_to(ROOT_DIR)}）')
+    args = parser.parse_args(argv)
+
+    jobs = filter_jobs(discover_jobs(), args.patterns)
+    if not jobs:
+        print('対象の生成関数が見つかりませんでした')
+        return 1
+
+    start = time.perf_counter()
+    results = check_jobs(jobs, args.tolerance, args.timeout)
+    total_elapsed = time.perf_counter() - start
+    write_report(args.report, results, total_elapsed, args.tolerance)
+    print_results(results)
+
+    counts = count_issues(results)
+    failed = sum(not result['ok'] for result in results)
+    check_elapsed = sum(result['check_elapsed'] for result in results)
+    print()
+    print(f"重なり: {counts['overlap']}件 / はみ出し: {counts['overflow']}件 / 図の外: {counts['clipped']}件"
+          f" / 失敗: {failed}件（{len(jobs)}件、合計 {total_elapsed:.1f}秒、うち検査 {check_elapsed * 1000:.0f}ms）")
+    print(f'検査レポート: {args.report}')
+    return 1 if failed or any(counts.values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+図のテンプレート（同じ形の画像をまとめて生成するときにアーティストを使い回す）
+- 図・Axes・タイトルなど変わらない部分は1回だけ作る
+- 項目ごとのボックスや文字はプールから取り出し、位置・文字・色だけを差し替える
+  （足りない分だけ作り、前の画像より少なければ余りを非表示にする）
+- 枠・背景などの多数のパッチは PatchCollection にまとめ、画像1枚につき1回の描画呼び出しにする
+  （Rectangle を1個ずつ add_patch すると、描画時間がセル数に比例して増える）
+- Axes は図全体を覆い、データ座標 1 = 1インチ（y は上から下）。中身の範囲を計算して
+  set_extent() で図の大きさをちょうどに合わせるので、tight_layout や余白の切り抜きが要らない
+- 図は pyplot の管理外（matplotlib.figure.Figure）なので、ジョブごとの plt.close('all') では消えない
+- テンプレートはスレッドごとに1つ（shared()）。1つの図を複数のスレッドが同時に書き換えないので、
+  別々のスレッドから同時に render() できる
+
+generate_checklists_fixed.py / generate_comparison_tables_fixed.py が、
+shared() で取り出したテンプレートで画像ごとに render() する。
+"""
+import threading
+
+from matplotlib.collections import PatchCollection
+from matplotlib.figure import Figure
+
+# 中身の外側に残す余白（インチ、bbox_inches='tight' の pad_inches=0.1 より少し広め）
+CONTENT_PAD = 0.15
+
+# スレッドごとのテンプレート（クラス → インスタンス）
+_thread_templates = threading.local()
+
+
+class ArtistPool:
+    """同じ種類のアーティストを使い回す
+
+    take() で次のアーティストを返し（無ければ factory で作って Axes に追加）、
+    hide_unused() で今回使わなかった分を非表示にする。
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.artists = []
+        self.used = 0
+
+    def reset(self):
+        self.used = 0
+
+    def take(self):
+        if self.used == len(self.artists):
+            self.artists.append(self.factory())
+        artist = self.artists[self.used]
+        self.used += 1
+        artist.set_visible(True)
+        return artist
+
+    def hide_unused(self):
+        for artist in self.artists[self.used:]:
+            artist.set_visible(False)
+
+
+class PatchBatch:
+    """多数のパッチを1つの PatchCollection として描画する
+
+    add() したパッチ（Axes には追加しない）の形・塗り・枠線を、update() でまとめて反映する。
+    """
+
+    def __init__(self, ax, zorder=1):
+        # 角の形は個別の Patch と同じ（Collection の既定は丸め）
+        self.collection = ax.add_collection(PatchCollection([], joinstyle='miter', capstyle='butt',
+                                                            zorder=zorder), autolim=False)
+        self.patches = []
+
+    def reset(self):
+        self.patches = []
+
+    def add(self, patch):
+        self.patches.append(patch)
+        return patch
+
+    def update(self):
+        collection = self.collection
+        collection.set_paths(self.patches)
+        collection.set_facecolor([patch.get_facecolor() for patch in self.patches])
+        collection.set_edgecolor([patch.get_edgecolor() for patch in self.patches])
+        collection.set_linewidth([patch.get_linewidth() for patch in self.patches])
+
+
+def patch_collection(ax, patches, zorder=1):
+    """パッチのリストを1つの PatchCollection として Axes に追加する（テンプレートを使わない図用）"""
+    collection = PatchCollection(patches, match_original=True, joinstyle='miter', capstyle='butt', zorder=zorder)
+    return ax.add_collection(collection, autolim=False)
+
+
+class FigureTemplate:
+    """1つの図と Axes を持ち、画像ごとに中身を差し替えるテンプレートの基底クラス
+
+    サブクラスは __init__ で固定部分とプール・PatchBatch を作り、render() の中で
+    begin() → プールから take() して差し替え・PatchBatch に add() → set_extent() → end() の順に呼び、
+    save_figure(..., close=False, crop=False) で保存する。
+    """
+
+    def __init__(self):
+        self.fig = Figure()
+        self.ax = self.fig.add_axes([0, 0, 1, 1])
+        self.ax.axis('off')
+        self.pools = []
+        self.batches = []
+
+    @classmethod
+    def shared(cls):
+        """このスレッドで使い回すテンプレート（初回だけ作る）"""
+        templates = _thread_templates.__dict__.setdefault('templates', {})
+        if cls not in templates:
+            templates[cls] = cls()
+        return templates[cls]
+
+    def pool(self, factory):
+        """テンプレートで使い回すプールを作る"""
+        pool = ArtistPool(factory)
+        self.pools.append(pool)
+        return pool
+
+    def batch(self):
+        """まとめて描画するパッチの PatchBatch を作る（作った順に下から描画される）"""
+        batch = PatchBatch(self.ax)
+        self.batches.append(batch)
+        return batch
+
+    def begin(self):
+        """画像1枚分の差し替えを始める"""
+        for pool in self.pools:
+            pool.reset()
+        for batch in self.batches:
+            batch.reset()
+
+    def set_extent(self, left, right, top, bottom):
+        """データ座標の範囲（インチ）がちょうど収まる大きさに図を合わせる"""
+        self.fig.set_size_inches((right - left, bottom - top), forward=False)
+        self.ax.set_xlim(left, right)
+        self.ax.set_ylim(bottom, top)
+
+    def end(self):
+        """今回使わなかったアーティストを非表示にし、PatchBatch を反映する"""
+        for pool in self.pools:
+            pool.hide_unused()
+        for batch in self.batches:
+            batch.update()
@@ -2,21 +2,23 @@
 """
 BGM音量管理ガイド画像を生成するスクリプト
 """
-import matplotlib.pyplot as plt
+import matplotlib
 import matplotlib.patches as patches
 from matplotlib.patches import FancyBboxPatch
-import japanize_matplotlib
 from pathlib import Path
 
+from image_fonts import setup_fonts
+from image_output import layout_figure, new_figure, save_figure
+
 # 日本語フォント設定
-plt.rcParams['font.sans-serif'] = ['Hiragino Sans', 'Yu Gothic', 'Meirio', 'Takao', 'IPAexGothic', 'IPAPGothic']
-plt.rcParams['font.size'] = 10
-plt.rcParams['axes.unicode_minus'] = False
+setup_fonts()
+matplotlib.rcParams['font.size'] = 10
+matplotlib.rcParams['axes.unicode_minus'] = False
 
 
 def create_bgm_volume_management():
     """BGM音量管理ガイド"""
-    fig, ax = plt.subplots(figsize=(14, 10))
+    fig, ax = new_figure(figsize=(14, 10))
     ax.set_xlim(0, 14)
     ax.set_ylim(0, 10)
     ax.axis('off')
@@ -108,13 +110,10 @@ def create_bgm_volume_management():
                 ha='left', va='center', fontsize=9)
         y_pos -= 0.3
 
-    plt.tight_layout(pad=1.5)
+    layout_figure(fig, pad=1.5)
 
     output_path = Path('public/mild-response/images/bgm-volume-management.png')
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    plt.savefig(output_path, dpi=150, bbox_inches='tight', facecolor='white')
-    plt.close()
-    print(f"✓ {output_path}")
+    save_figure(fig, output_path)
 
 
 if __name__ == "__main__":
@@ -5,11 +5,12 @@
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 from matplotlib.patches import FancyBboxPatch, Rectangle
-import japanize_matplotlib
 from pathlib import Path
 
+from image_fonts import setup_fonts
+
 # 日本語フォント設定
-plt.rcParams['font.sans-serif'] = ['Hiragino Sans', 'Yu Gothic', 'Meirio', 'Takao', 'IPAexGothic', 'IPAPGothic']
+setup_fonts()
 plt.rcParams['font.size'] = 9
 
 
@@ -3,97 +3,135 @@
 比較表・一覧表画像を生成するスクリプト（修正版）
 - テキストの重なり防止
 - 適切な余白確保
-- 改行処理の改善
+- 改行処理の改善（フォントの実際の文字幅と禁則で折り返す、text_wrap）
+- create_table_image の図は1回だけ作り、表ごとに文字・位置・色だけを差し替える（figure_template）
+  行の高さは折り返した行数から求め、図の大きさを表にちょうど合わせる（余白を描画してから切り抜かない）
 """
-import matplotlib.pyplot as plt
+import matplotlib
 import matplotlib.patches as patches
 from matplotlib.patches import FancyBboxPatch, Rectangle
-import japanize_matplotlib
 from pathlib import Path
 import numpy as np
-import textwrap
+
+from figure_template import CONTENT_PAD, FigureTemplate
+from image_fonts import setup_fonts
+from image_output import layout_figure, new_figure, save_figure
+from text_wrap import text_width, wrap
 
 # 日本語フォント設定（改善版）
-plt.rcParams['font.sans-serif'] = ['Hiragino Sans', 'Yu Gothic', 'Meirio', 'Takao', 'IPAexGothic', 'IPAPGothic']
-plt.rcParams['font.size'] = 9
-plt.rcParams['axes.unicode_minus'] = False  # マイナス記号の文字化け防止
+setup_fonts()
+matplotlib.rcParams['font.size'] = 9
+matplotlib.rcParams['axes.unicode_minus'] = False  # マイナス記号の文字化け防止
 
 
-def wrap_text(text, width=20):
-    """テキストを指定幅で改行（既に改行されているテキストも処理）"""
-    if '\n' in text:
-        # 既に改行がある場合はそのまま返す
-        return text
-    return '\n'.join(textwrap.wrap(str(text), width=width))
+# セルの文字の左右に空ける余白の合計（pt）
+CELL_PADDING_PT = 8
+# col_widths の合計 1.0 に対する表の幅（インチ）
+TABLE_WIDTH = 12.0
+# 行の高さ: 文字の上下の余白（インチ）と最小の高さ
+CELL_PADDING_Y = 0.15
+MIN_ROW_HEIGHT = 0.5
+HEADER_FONT = (9, 'bold', 1.3)  # (文字サイズ, 太さ, 行間)
+CELL_FONT = (8, 'normal', 1.2)
 
 
-def create_table_image(title, headers, rows, output_path, col_widths=None):
-    """汎用的なテーブル画像生成関数（改善版）"""
-    num_cols = len(headers)
-    num_rows = len(rows)
+def wrap_cell(text, width, fontsize, weight='normal'):
+    """セルの幅 width（pt）に収まるよう、実際の文字幅で折り返す（既にある改行は残す）"""
+    return wrap(str(text), width - CELL_PADDING_PT, fontsize, weight)
 
-    if col_widths is None:
-        col_widths = [1.0 / num_cols] * num_cols
 
-    # 高さを動的に調整
-    fig_height = max(8, 3 + num_rows * 0.8)
+def row_height(texts, font):
+    """折り返したセルの文字列から行の高さ（インチ）を求める"""
+    fontsize, _, linespacing = font
+    lines = max(text.count('\n') + 1 for text in texts)
+    return max(MIN_ROW_HEIGHT, lines * fontsize * linespacing / 72 + 2 * CELL_PADDING_Y)
 
-    fig, ax = plt.subplots(figsize=(14, fig_height))
-    ax.set_xlim(0, 1)
-    ax.set_ylim(0, 1)
-    ax.axis('off')
 
-    # タイトル（余白を確保）
-    ax.text(0.5, 0.97, title, ha='center', va='top', fontsize=14, fontweight='bold')
+class TableTemplate(FigureTemplate):
+    """テーブル画像のテンプレート
 
-    # テーブルのY座標（タイトルとの余白を確保）
-    table_top = 0.92
-    row_height = 0.75 / (num_rows + 1)
+    タイトルは1つ、ヘッダー・セルの文字はプールで使い回し、画像ごとに位置・文字だけを差し替える。
+    セルの枠は行数によらず2つの PatchCollection（ヘッダー・データ）で描画する。
+    行の高さは折り返した行数から求め、図の大きさを表とタイトルにちょうど合わせる。
+    """
 
-    # ヘッダー行
-    x_pos = 0.05
-    for i, (header, width) in enumerate(zip(headers, col_widths)):
-        # ヘッダーセル
-        header_box = Rectangle((x_pos, table_top - row_height), width * 0.88, row_height,
-                               edgecolor='black', facecolor='#1976D2', linewidth=1.5)
-        ax.add_patch(header_box)
+    def __init__(self):
+        super().__init__()
+        ax = self.ax
 
-        # ヘッダーテキスト（改行対応）
-        wrapped_header = wrap_text(header, width=12)
-        ax.text(x_pos + width * 0.44, table_top - row_height / 2,
-                wrapped_header, ha='center', va='center', fontsize=9,
-                fontweight='bold', color='white', linespacing=1.3)
-        x_pos += width * 0.88
+        # タイトル（余白を確保）
+        self.title = ax.text(0, 0, '', ha='center', va='top', fontsize=14, fontweight='bold')
 
-    # データ行
-    for row_idx, row_data in enumerate(rows):
-        x_pos = 0.05
-        y_pos = table_top - (row_idx + 2) * row_height
+        # ヘッダーセルとデータセルの枠は PatchCollection にまとめて描画（ヘッダー → データの順）
+        self.header_boxes = self.batch()
+        self.cell_boxes = self.batch()
 
-        # 行の背景色（交互）
-        bg_color = '#F5F5F5' if row_idx % 2 == 0 else 'white'
-
-        for col_idx, (cell_data, width) in enumerate(zip(row_data, col_widths)):
-            # セル
-            cell_box = Rectangle((x_pos, y_pos), width * 0.88, row_height,
-                                edgecolor='#BDBDBD', facecolor=bg_color, linewidth=1)
-            ax.add_patch(cell_box)
-
-            # セルテキスト（改行処理を改善）
-            # 既に改行がある場合はそのまま使用、ない場合は幅に応じて改行
-            cell_text = str(cell_data)
-            if '\n' not in cell_text and len(cell_text) > 15:
-                cell_text = wrap_text(cell_text, width=int(width * 50))
+        # ヘッダーテキスト（改行対応）
+        fontsize, weight, linespacing = HEADER_FONT
+        self.header_texts = self.pool(lambda: ax.text(0, 0, '', ha='center', va='center', fontsize=fontsize,
+                                                      fontweight=weight, color='white', linespacing=linespacing))
+
+        # セルテキスト
+        fontsize, weight, linespacing = CELL_FONT
+        self.cell_texts = self.pool(lambda: ax.text(0, 0, '', ha='center', va='center', fontsize=fontsize,
+                                                    fontweight=weight, linespacing=linespacing))
+
+    def render(self, title, headers, rows, output_path, col_widths=None):
+        num_cols = len(headers)
+
+        if col_widths is None:
+            col_widths = [1.0 / num_cols] * num_cols
+        # 列の幅（インチ）と左端の位置
+        widths = [width * TABLE_WIDTH for width in col_widths]
+        lefts = [sum(widths[:i]) for i in range(num_cols)]
+        table_width = sum(widths)
+
+        self.begin()
+
+        # タイトル（表の中央の上）
+        title_width = text_width(title, 14, 'bold') / 72
+        self.title.set_position((table_width / 2, 0))
+        self.title.set_text(title)
+
+        # テーブルのY座標（タイトルとの余白を確保）
+        y_pos = 14 * 1.2 / 72 + 0.3
+
+        # ヘッダー行・データ行（セルの文字を折り返し、最も行数の多いセルに高さを合わせる）
+        table_rows = [(headers, HEADER_FONT, self.header_boxes, self.header_texts, None)]
+        for row_idx, row_data in enumerate(rows):
+            # 行の背景色（交互）
+            bg_color = '#F5F5F5' if row_idx % 2 == 0 else 'white'
+            table_rows.append((row_data, CELL_FONT, self.cell_boxes, self.cell_texts, bg_color))
+
+        for cells, font, boxes, texts, bg_color in table_rows:
+            fontsize, weight, _ = font
+            wrapped = [wrap_cell(cell, width * 72, fontsize, weight) for cell, width in zip(cells, widths)]
+            height = row_height(wrapped, font)
+            for cell_text, left, width in zip(wrapped, lefts, widths):
+                if bg_color is None:
+                    boxes.add(Rectangle((left, y_pos), width, height,
+                                        edgecolor='black', facecolor='#1976D2', linewidth=1.5))
+                else:
+                    boxes.add(Rectangle((left, y_pos), width, height,
+                                        edgecolor='#BDBDBD', facecolor=bg_color, linewidth=1))
+                text = texts.take()
+                text.set_position((left + width / 2, y_pos + height / 2))
+                text.set_text(cell_text)
+            y_pos += height
+
+        # 表とタイトルにちょうど合う大きさの図にする
+        left = min(0, table_width / 2 - title_width / 2)
+        right = max(table_width, table_width / 2 + title_width / 2)
+        self.set_extent(left - CONTENT_PAD, right + CONTENT_PAD, -CONTENT_PAD, y_pos + CONTENT_PAD)
+
+        self.end()
+        save_figure(self.fig, output_path, close=False, crop=False)
 
-            ax.text(x_pos + width * 0.44, y_pos + row_height / 2,
-                   cell_text, ha='center', va='center', fontsize=8,
-                   linespacing=1.2)
-            x_pos += width * 0.88
 
-    plt.tight_layout(pad=1.5)
-    plt.savefig(output_path, dpi=150, bbox_inches='tight', facecolor='white')
-    plt.close()
-    print(f"✓ {output_path}")
+def create_table_image(title, headers, rows, output_path, col_widths=None):
+    """汎用的なテーブル画像生成関数（改善版）"""
+    # 同じスレッドで生成する間、テーブルの図を使い回す
+    TableTemplate.shared().render(title, headers, rows, output_path, col_widths)
 
 
 def create_monitoring_tools_comparison():
@@ -108,13 +146,13 @@ def create_monitoring_tools_comparison():
         ['Google\nアラート', '無料', 'ウェブ全体', 'キーワード通知\nメール配信', '個人・\n小規模']
     ]
 
-    output_path = Path('content/bridge/images/monitoring-tools-comparison.png')
+    output_path = Path('public/bridge/images/monitoring-tools-comparison.png')
     create_table_image(title, headers, rows, output_path, col_widths=[0.18, 0.14, 0.22, 0.28, 0.14])
 
 
 def create_response_tone_comparison():
     """口コミ返信の温度感比較表（改善版）"""
-    fig, ax = plt.subplots(figsize=(14, 11))
+    fig, ax = new_figure(figsize=(14, 11))
     ax.set_xlim(0, 14)
     ax.set_ylim(0, 11)
     ax.axis('off')
@@ -226,12 +264,10 @@ def create_response_tone_comparison():
     if min_y < 0:
         ax.set_ylim(min_y - 0.5, 11)
 
-    plt.tight_layout(pad=1.5)
+    layout_figure(fig, pad=1.5)
 
-    output_path = Path('content/mild-response/images/response-tone-comparison.png')
-    plt.savefig(output_path, dpi=150, bbox_inches='tight', facecolor='white')
-    plt.close()
-    print(f"✓ {output_path}")
+    output_path = Path('public/mild-response/images/response-tone-comparison.png')
+    save_figure(fig, output_path)
 
 
 def create_platform_response_time_table():
@@ -248,13 +284,13 @@ def create_platform_response_time_table():
         ['楽天トラベル', '24時間以内', '予約検討中の\n顧客が閲覧', '予約機会損失']
     ]
 
-    output_path = Path('content/platform-specific/images/platform-response-time-table.png')
+    output_path = Path('public/platform-specific/images/platform-response-time-table.png')
     create_table_image(title, headers, rows, output_path, col_widths=[0.20, 0.18, 0.28, 0.24])
 
 
 def create_lawyer_consultation_criteria():
     """弁護士相談が必要なケース判定表（改善版）"""
-    fig, ax = plt.subplots(figsize=(14, 11))
+    fig, ax = new_figure(figsize=(14, 11))
     ax.set_xlim(0, 14)
     ax.set_ylim(0, 11)
     ax.axis('off')
@@ -363,17 +399,15 @@ def create_lawyer_consultation_criteria():
     ax.text(7, note_y - 0.95, '・早期相談で被害拡大を防げます。迷ったらすぐに相談してください。',
             ha='center', va='center', fontsize=9)
 
-    plt.tight_layout(pad=1.5)
+    layout_figure(fig, pad=1.5)
 
-    output_path = Path('content/escalation/images/lawyer-consultation-criteria.png')
-    plt.savefig(output_path, dpi=150, bbox_inches='tight', facecolor='white')
-    plt.close()
-    print(f"✓ {output_path}")
+    output_path = Path('public/escalation/images/lawyer-consultation-criteria.png')
+    save_figure(fig, output_path)
 
 
 def create_crisis_level_matrix():
     """危機レベルマトリックス（影響度 x 拡散度）（改善版）"""
-    fig, ax = plt.subplots(figsize=(12, 10))
+    fig, ax = new_figure(figsize=(12, 10))
     ax.set_xlim(0, 12)
     ax.set_ylim(0, 10)
     ax.axis('off')
@@ -445,12 +479,10 @@ def create_crisis_level_matrix():
     ax.text(6, 8.35, '拡散度: 低=RT<100, 中=100-1000, 高=1000以上  |  影響度: 低=個人的不満, 中=サービス問題, 高=法的リスク・社会問題',
             ha='center', va='center', fontsize=8)
 
-    plt.tight_layout(pad=1.5)
+    layout_figure(fig, pad=1.5)
 
-    output_path = Path('content/platform-specific/images/crisis-level-matrix.png')
-    plt.savefig(output_path, dpi=150, bbox_inches='tight', facecolor='white')
-    plt.close()
-    print(f"✓ {output_path}")
+    output_path = Path('public/platform-specific/images/crisis-level-matrix.png')
+    save_figure(fig, output_path)
 
 
 if __name__ == "__main__":
@@ -2,19 +2,21 @@
 """
 フローチャート画像を生成するスクリプト
 """
-import matplotlib.pyplot as plt
+import matplotlib
 import matplotlib.patches as patches
 from matplotlib.patches import FancyBboxPatch, FancyArrowPatch
-import japanize_matplotlib
 from pathlib import Path
 
+from image_fonts import setup_fonts
+from image_output import layout_figure, new_figure, save_figure
+
 # 日本語フォント設定
-plt.rcParams['font.sans-serif'] = ['Hiragino Sans', 'Yu Gothic', 'Meirio', 'Takao', 'IPAexGothic', 'IPAPGothic']
-plt.rcParams['font.size'] = 10
+setup_fonts()
+matplotlib.rcParams['font.size'] = 10
 
 def create_twitter_crisis_scale_flowchart():
     """Twitter炎上規模の判定フローチャート"""
-    fig, ax = plt.subplots(figsize=(12, 10))
+    fig, ax = new_figure(figsize=(12, 10))
     ax.set_xlim(0, 10)
     ax.set_ylim(0, 10)
     ax.axis('off')
@@ -129,17 +131,15 @@ def create_twitter_crisis_scale_flowchart():
     ax.text(1.5, legend_y - 0.3, '中規模: 100 ≤ RT < 1000, リプライ ≥ 50', ha='left', va='center', fontsize=8)
     ax.text(1.5, legend_y - 0.6, '大規模: RT ≥ 1000, まとめサイト転載', ha='left', va='center', fontsize=8)
 
-    plt.tight_layout()
+    layout_figure(fig)
 
-    output_path = Path('content/platform-specific/images/twitter-crisis-scale-flowchart.png')
-    plt.savefig(output_path, dpi=150, bbox_inches='tight', facecolor='white')
-    plt.close()
-    print(f"✓ {output_path}")
+    output_path = Path('public/platform-specific/images/twitter-crisis-scale-flowchart.png')
+    save_figure(fig, output_path)
 
 
 def create_crisis_24hour_timeline():
     """炎上初動24時間のタイムライン"""
-    fig, ax = plt.subplots(figsize=(14, 8))
+    fig, ax = new_figure(figsize=(14, 8))
     ax.set_xlim(0, 14)
     ax.set_ylim(0, 8)
     ax.axis('off')
@@ -245,17 +245,15 @@ def create_crisis_24hour_timeline():
     ax.text(7, 0.8, '※ 初動24時間が最も重要。この期間の対応で被害の規模が決まります。',
             ha='center', va='center', fontsize=9, style='italic')
 
-    plt.tight_layout()
+    layout_figure(fig)
 
-    output_path = Path('content/platform-specific/images/crisis-24hour-timeline.png')
-    plt.savefig(output_path, dpi=150, bbox_inches='tight', facecolor='white')
-    plt.close()
-    print(f"✓ {output_path}")
+    output_path = Path('public/platform-specific/images/crisis-24hour-timeline.png')
+    save_figure(fig, output_path)
 
 
 def create_tweet_deletion_decision_chart():
     """ツイート削除判断チャート"""
-    fig, ax = plt.subplots(figsize=(12, 9))
+    fig, ax = new_figure(figsize=(12, 9))
     ax.set_xlim(0, 12)
     ax.set_ylim(0, 9)
     ax.axis('off')
@@ -390,17 +388,15 @@ def create_tweet_deletion_decision_chart():
     ax.text(6, 0.55, '① 削除前に必ずスクリーンショットを保存  ② 削除したことを謝罪ツイートで言及  ③ 削除理由を明確に説明',
             ha='center', va='center', fontsize=8, color='#1565C0')
 
-    plt.tight_layout()
+    layout_figure(fig)
 
-    output_path = Path('content/platform-specific/images/tweet-deletion-decision-chart.png')
-    plt.savefig(output_path, dpi=150, bbox_inches='tight', facecolor='white')
-    plt.close()
-    print(f"✓ {output_path}")
+    output_path = Path('public/platform-specific/images/tweet-deletion-decision-chart.png')
+    save_figure(fig, output_path)
 
 
 def create_twitter_report_procedure():
     """Twitter通報手順のスクリーンショット付き解説"""
-    fig, ax = plt.subplots(figsize=(12, 10))
+    fig, ax = new_figure(figsize=(12, 10))
     ax.set_xlim(0, 12)
     ax.set_ylim(0, 10)
     ax.axis('off')
@@ -489,17 +485,15 @@ def create_twitter_report_procedure():
     ax.text(6, 0.5, '※ Twitter通報だけでは削除されないこともあります。法的措置が必要な場合は弁護士に相談してください。',
             ha='center', va='center', fontsize=8, style='italic', color='#666')
 
-    plt.tight_layout()
+    layout_figure(fig)
 
-    output_path = Path('content/platform-specific/images/twitter-report-procedure.png')
-    plt.savefig(output_path, dpi=150, bbox_inches='tight', facecolor='white')
-    plt.close()
-    print(f"✓ {output_path}")
+    output_path = Path('public/platform-specific/images/twitter-report-procedure.png')
+    save_figure(fig, output_path)
 
 
 def create_google_removal_request_procedure():
     """Google検索結果からの削除依頼手順"""
-    fig, ax = plt.subplots(figsize=(12, 10))
+    fig, ax = new_figure(figsize=(12, 10))
     ax.set_xlim(0, 12)
     ax.set_ylim(0, 10)
     ax.axis('off')
@@ -603,118 +597,10 @@ def create_google_removal_request_procedure():
     ax.text(1, 0.8, '・削除よりも、新しいポジティブな情報を増やす「レピュテーションマネジメント」が効果的', ha='left', va='center', fontsize=9)
     ax.text(1, 0.5, '・費用: 月額20万円〜100万円（レピュテーションマネジメント会社）', ha='left', va='center', fontsize=9)
 
-    plt.tight_layout()
-
-    output_path = Path('content/platform-specific/images/google-removal-request-procedure.png')
-    plt.savefig(output_path, dpi=150, bbox_inches='tight', facecolor='white')
-    plt.close()
-    print(f"✓ {output_path}")
-
-
-def create_sns_pre_post_checklist():
-    """SNS投稿前チェックリスト"""
-    # カテゴリ数と項目数から高さを動的に計算
-    total_categories = 5
-    total_items = 4 + 4 + 4 + 4 + 4  # 各カテゴリ4項目
-    fig_height = max(16, 4.5 + total_categories * 1.2 + total_items * 0.55 + 2.5)
-
-    fig, ax = plt.subplots(figsize=(12, fig_height))
-    ax.set_xlim(0, 12)
-    ax.set_ylim(0, fig_height)
-    ax.axis('off')
-
-    # タイトル
-    title_y = fig_height - 0.5
-    ax.text(6, title_y, 'SNS投稿前チェックリスト',
-            ha='center', va='center', fontsize=14, fontweight='bold')
-    ax.text(6, title_y - 0.4, '〜炎上を防ぐための10のポイント〜',
-            ha='center', va='center', fontsize=11, style='italic')
-
-    # チェックリスト項目
-    checklist_items = [
-        ('基本チェック', [
-            '誤字脱字はないか？',
-            '文法的に正しいか？',
-            'リンクは正しく機能するか？',
-            '画像・動画は適切か？'
-        ], '#E3F2FD', '#1565C0'),
-        ('内容チェック', [
-            '誤解を招く表現はないか？',
-            '事実と異なる情報はないか？',
-            '過度な誇張はないか？',
-            '他社を批判していないか？'
-        ], '#FFF3E0', '#E65100'),
-        ('炎上リスクチェック', [
-            '差別的表現はないか？',
-            '政治・宗教・ジェンダーに触れていないか？',
-            '特定の個人・団体を攻撃していないか？',
-            '不謹慎と受け取られる可能性はないか？'
-        ], '#FFEBEE', '#C62828'),
-        ('タイミングチェック', [
-            '災害・事故発生直後ではないか？',
-            '選挙期間中ではないか？',
-            '大型連休中（炎上しやすい）ではないか？',
-            '深夜・早朝（判断力が鈍る）ではないか？'
-        ], '#F3E5F5', '#6A1B9A'),
-        ('最終確認', [
-            '複数人（2名以上）でチェックしたか？',
-            '上司・責任者の承認を得たか？',
-            '投稿後の監視体制は整っているか？',
-            '炎上時の対応フローは把握しているか？'
-        ], '#E8F5E9', '#2E7D32')
-    ]
-
-    y_position = title_y - 1.2
-    item_spacing = 0.55  # 項目間の間隔をさらに広げる
-    category_spacing = 0.7  # カテゴリ間の間隔をさらに広げる
-
-    for category, items, bg_color, text_color in checklist_items:
-        # カテゴリボックス
-        category_box = FancyBboxPatch((0.5, y_position - 0.55), 11, 0.65,
-                                     boxstyle="round,pad=0.1",
-                                     edgecolor=text_color, facecolor=bg_color, linewidth=2)
-        ax.add_patch(category_box)
-        ax.text(1, y_position - 0.225, category, ha='left', va='center',
-                fontsize=11, fontweight='bold', color=text_color)
-
-        y_position -= 0.85
-
-        # チェック項目
-        for item in items:
-            # チェックボックス
-            checkbox = FancyBboxPatch((1.2, y_position - 0.15), 0.25, 0.25,
-                                     boxstyle="round,pad=0.02",
-                                     edgecolor='black', facecolor='white', linewidth=1.5)
-            ax.add_patch(checkbox)
-
-            # 項目テキスト
-            ax.text(1.7, y_position, item, ha='left', va='center', fontsize=9)
-
-            y_position -= item_spacing
-
-        y_position -= category_spacing
-
-    # 使い方ガイド（位置を調整）
-    guide_y = y_position - 0.5
-    guide_box = FancyBboxPatch((0.5, guide_y - 0.6), 11, 1.0,
-                              boxstyle="round,pad=0.15",
-                              edgecolor='#1976D2', facecolor='#E3F2FD', linewidth=2)
-    ax.add_patch(guide_box)
-    ax.text(6, guide_y + 0.2, '【使い方】', ha='center', va='center', fontsize=10, fontweight='bold', color='#1565C0')
-    ax.text(1, guide_y - 0.1, '① 投稿前にこのチェックリストを印刷またはデジタルで用意', ha='left', va='center', fontsize=9)
-    ax.text(1, guide_y - 0.35, '② 必ず2名以上で全項目をチェック', ha='left', va='center', fontsize=9)
-
-    # Y軸の下限を調整してガイドボックスが確実に表示されるようにする
-    min_y = guide_y - 0.8
-    if min_y < 0:
-        ax.set_ylim(min_y - 0.5, fig_height)
-
-    plt.tight_layout(pad=1.5)
+    layout_figure(fig)
 
-    output_path = Path('content/platform-specific/images/sns-pre-post-checklist.png')
-    plt.savefig(output_path, dpi=150, bbox_inches='tight', facecolor='white')
-    plt.close()
-    print(f"✓ {output_path}")
+    output_path = Path('public/platform-specific/images/google-removal-request-procedure.png')
+    save_figure(fig, output_path)
 
 
 if __name__ == "__main__":
@@ -726,7 +612,8 @@ if __name__ == "__main__":
     create_tweet_deletion_decision_chart()
     create_twitter_report_procedure()
     create_google_removal_request_procedure()
-    create_sns_pre_post_checklist()
+    # SNS投稿前チェックリストは checklists/sns-pre-post-checklist.json から
+    # generate_checklists_fixed.py で生成する
 
     print()
     print("✅ すべてのフローチャート画像を生成しました！")
@@ -8,11 +8,12 @@
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 from matplotlib.patches import FancyBboxPatch, FancyArrowPatch
-import japanize_matplotlib
 from pathlib import Path
 
+from image_fonts import setup_fonts
+
 # 日本語フォント設定（改善版）
-plt.rcParams['font.sans-serif'] = ['Hiragino Sans', 'Yu Gothic', 'Meirio', 'Takao', 'IPAexGothic', 'IPAPGothic']
+setup_fonts()
 plt.rcParams['font.size'] = 10
 plt.rcParams['axes.unicode_minus'] = False
 
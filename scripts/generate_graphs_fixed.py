@@ -5,21 +5,23 @@
 - 軸ラベルの重なり防止
 - 余白の適切な確保
 """
-import matplotlib.pyplot as plt
+import matplotlib
 import matplotlib.patches as patches
-import japanize_matplotlib
 from pathlib import Path
 import numpy as np
 
+from image_fonts import setup_fonts
+from image_output import layout_figure, new_figure, save_figure
+
 # 日本語フォント設定（改善版）
-plt.rcParams['font.sans-serif'] = ['Hiragino Sans', 'Yu Gothic', 'Meirio', 'Takao', 'IPAexGothic', 'IPAPGothic']
-plt.rcParams['font.size'] = 10
-plt.rcParams['axes.unicode_minus'] = False  # マイナス記号の文字化け防止
+setup_fonts()
+matplotlib.rcParams['font.size'] = 10
+matplotlib.rcParams['axes.unicode_minus'] = False  # マイナス記号の文字化け防止
 
 
 def create_rating_recovery_graph():
     """評価回復グラフ（炎上後の評価推移）（改善版）"""
-    fig, ax = plt.subplots(figsize=(13, 7.5))
+    fig, ax = new_figure(figsize=(13, 7.5))
 
     # 時系列データ
     months = np.arange(0, 13)
@@ -70,17 +72,15 @@ def create_rating_recovery_graph():
     for rating in [2.0, 3.0, 4.0, 5.0]:
         ax.axhline(y=rating, color='#E0E0E0', linestyle=':', linewidth=1, alpha=0.5)
 
-    plt.tight_layout(pad=1.5)
+    layout_figure(fig, pad=1.5)
 
-    output_path = Path('content/bridge/images/rating-recovery-graph.png')
-    plt.savefig(output_path, dpi=150, bbox_inches='tight', facecolor='white')
-    plt.close()
-    print(f"✓ {output_path}")
+    output_path = Path('public/bridge/images/rating-recovery-graph.png')
+    save_figure(fig, output_path)
 
 
 def create_response_time_impact_graph():
     """返信速度と顧客満足度の相関グラフ（改善版）"""
-    fig, ax = plt.subplots(figsize=(13, 7.5))
+    fig, ax = new_figure(figsize=(13, 7.5))
 
     # データ
     response_hours = np.array([1, 3, 6, 12, 24, 48, 72, 168])
@@ -117,17 +117,15 @@ def create_response_time_impact_graph():
             fontweight='bold', color='#2E7D32',
             bbox=dict(boxstyle='round', facecolor='#C8E6C9', alpha=0.7))
 
-    plt.tight_layout(pad=1.5)
+    layout_figure(fig, pad=1.5)
 
-    output_path = Path('content/platform-specific/images/response-time-impact-graph.png')
-    plt.savefig(output_path, dpi=150, bbox_inches='tight', facecolor='white')
-    plt.close()
-    print(f"✓ {output_path}")
+    output_path = Path('public/platform-specific/images/response-time-impact-graph.png')
+    save_figure(fig, output_path)
 
 
 def create_meo_ranking_improvement_graph():
     """MEO順位改善グラフ（改善版）"""
-    fig, ax = plt.subplots(figsize=(13, 7.5))
+    fig, ax = new_figure(figsize=(13, 7.5))
 
     # 返信率とMEO順位のデータ
     response_rate = np.array([0, 20, 40, 60, 80, 100])
@@ -162,17 +160,15 @@ def create_meo_ranking_improvement_graph():
 
     ax.legend(loc='upper right', fontsize=10)
 
-    plt.tight_layout(pad=1.5)
+    layout_figure(fig, pad=1.5)
 
-    output_path = Path('content/bridge/images/meo-ranking-improvement-graph.png')
-    plt.savefig(output_path, dpi=150, bbox_inches='tight', facecolor='white')
-    plt.close()
-    print(f"✓ {output_path}")
+    output_path = Path('public/bridge/images/meo-ranking-improvement-graph.png')
+    save_figure(fig, output_path)
 
 
 def create_review_response_roi_graph():
     """口コミ返信のROIグラフ（改善版）"""
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6.5))
+    fig, (ax1, ax2) = new_figure(1, 2, figsize=(14, 6.5))
 
     # 左側：コスト vs 売上増加
     categories = ['対応なし', '月10件\n返信', '月30件\n返信', '全件返信']
@@ -225,17 +221,15 @@ def create_review_response_roi_graph():
     ax2.axhline(y=500, color='#2196F3', linestyle='--', linewidth=2, label='目標ROI（500%）')
     ax2.legend(loc='upper right', fontsize=9)
 
-    plt.tight_layout(pad=2.0)
+    layout_figure(fig, pad=2.0)
 
-    output_path = Path('content/bridge/images/review-response-roi-graph.png')
-    plt.savefig(output_path, dpi=150, bbox_inches='tight', facecolor='white')
-    plt.close()
-    print(f"✓ {output_path}")
+    output_path = Path('public/bridge/images/review-response-roi-graph.png')
+    save_figure(fig, output_path)
 
 
 def create_crisis_damage_comparison():
     """炎上被害額の比較グラフ（改善版）"""
-    fig, ax = plt.subplots(figsize=(13, 8.5))
+    fig, ax = new_figure(figsize=(13, 8.5))
 
     # データ
     damage_categories = ['売上減少', '広告費\n増加', 'レピュテーション\nマネジメント費用',
@@ -292,17 +286,15 @@ def create_crisis_damage_comparison():
     ax.grid(axis='y', alpha=0.3, linestyle='--')
     ax.set_ylim(0, 650)
 
-    plt.tight_layout(pad=1.5)
+    layout_figure(fig, pad=1.5)
 
-    output_path = Path('content/platform-specific/images/crisis-damage-comparison.png')
-    plt.savefig(output_path, dpi=150, bbox_inches='tight', facecolor='white')
-    plt.close()
-    print(f"✓ {output_path}")
+    output_path = Path('public/platform-specific/images/crisis-damage-comparison.png')
+    save_figure(fig, output_path)
 
 
 def create_review_volume_trend():
     """口コミ件数推移グラフ（改善版）"""
-    fig, ax = plt.subplots(figsize=(13, 7.5))
+    fig, ax = new_figure(figsize=(13, 7.5))
 
     # 月次データ
     months = np.arange(1, 13)
@@ -341,12 +333,10 @@ def create_review_volume_trend():
     ax.axvspan(0.5, 6, alpha=0.1, color='gray')
     ax.axvspan(6, 12.5, alpha=0.1, color='green')
 
-    plt.tight_layout(pad=1.5)
+    layout_figure(fig, pad=1.5)
 
-    output_path = Path('content/bridge/images/review-volume-trend.png')
-    plt.savefig(output_path, dpi=150, bbox_inches='tight', facecolor='white')
-    plt.close()
-    print(f"✓ {output_path}")
+    output_path = Path('public/bridge/images/review-volume-trend.png')
+    save_figure(fig, output_path)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+記事ごとの OG 画像（SNS シェア用カード、1200×630）を生成するスクリプト
+- content/<カテゴリ>/<slug>.md の front matter（title / tags）から1記事1枚を生成
+  （front matter は PyYAML で読む。記事ページの gray-matter と同じく YAML として解釈する）
+- タイトルは実際の文字幅で折り返し（text_wrap、禁則処理つき）、3行に収まる文字サイズを選ぶ
+- 図（背景・カテゴリ帯・サイト名）は1回だけ組み立て、記事ごとに文字と色だけを差し替えて描画
+  （記事ごとに図を作り直さないので、70件以上でも数秒で終わる）
+- 出力先: public/og/<カテゴリ>/<slug>.png（内容が変わらなければ書き換えない）
+- data/image-manifest.json に登録し、記事ページの og:image に使われる（無い記事は og-default.png）
+
+使い方（リポジトリ直下で実行）:
+    python scripts/generate_og_images.py            # すべての記事
+    python scripts/generate_og_images.py escalation # パスに "escalation" を含む記事だけ
+"""
+import re
+import sys
+import time
+import matplotlib
+import yaml
+from matplotlib.figure import Figure
+from matplotlib.patches import FancyBboxPatch, Rectangle
+from pathlib import Path
+
+import image_manifest
+from image_fonts import setup_fonts
+from image_output import save_fixed_figure
+from text_wrap import text_width, wrap_lines
+
+setup_fonts()
+matplotlib.rcParams['font.size'] = 10
+matplotlib.rcParams['axes.unicode_minus'] = False
+
+CONTENT_DIR = image_manifest.ROOT_DIR / 'content'
+OG_DIR = Path('public/og')
+
+# 1200×630px（150dpi）
+OG_WIDTH, OG_HEIGHT = 1200, 630
+OG_DPI = 150
+
+SITE_NAME = '口コミ対応マニュアル'
+SITE_DOMAIN = 'review-safety.com'
+
+# カテゴリ: (表示名, テーマ色)
+CATEGORY_STYLES = {
+    'mild-response': ('通常対応', '#2563EB'),
+    'escalation': ('強め案件対応', '#DC2626'),
+    'industry-specific': ('業種別対応', '#059669'),
+    'platform-specific': ('プラットフォーム別対応', '#7C3AED'),
+    'playbook': ('全体フロー', '#EA580C'),
+    'bridge': ('ブリッジコンテンツ', '#0891B2'),
+}
+DEFAULT_STYLE = ('口コミ対応', '#1E40AF')
+
+# タイトルの文字サイズの候補。3行に収まる最初のものを使う
+TITLE_SIZES = [26, 22, 19]
+TITLE_MAX_LINES = 3
+SUBTITLE_SIZE = 14
+SUBTITLE_MAX_LINES = 2
+# タイトル・サブタイトルの折り返し幅（pt）: 左端 x=96 から右端の余白 96px まで
+TEXT_WIDTH_PT = (OG_WIDTH - 2 * 96) * 72 / OG_DPI
+# タグ欄とサイト名の間の余白（pt）
+TAGS_GAP_PT = 12
+
+
+def parse_front_matter(text):
+    """Markdown 先頭の front matter を YAML として読む（記事ページの gray-matter と同じ解釈）"""
+    match = re.match(r'---\r?\n(.*?)\r?\n---', text, re.S)
+    if not match:
+        return {}
+    data = yaml.safe_load(match.group(1))
+    return data if isinstance(data, dict) else {}
+
+
+def load_articles(content_dir=CONTENT_DIR):
+    """すべての記事の (カテゴリ, slug, front matter) を列挙"""
+    articles = []
+    for path in sorted(Path(content_dir).glob('*/*.md')):
+        try:
+            meta = parse_front_matter(path.read_text(encoding='utf-8'))
+        except yaml.YAMLError as e:
+            raise ValueError(f'{path} の front matter を読めません: {e}') from e
+        if meta.get('title'):
+            articles.append({'category': path.parent.name, 'slug': path.stem, **meta})
+    return articles
+
+
+def og_image_path(category, slug):
+    """記事の OG 画像の出力パス（リポジトリ直下からの相対パス）"""
+    return OG_DIR / category / f'{slug}.png'
+
+
+def fit_lines(text, fontsize, max_lines, weight='normal'):
+    """幅 TEXT_WIDTH_PT で折り返す（text_wrap: 実際の文字幅・禁則処理）。収まらない分は … で省略"""
+    lines = wrap_lines(text.strip(), TEXT_WIDTH_PT, fontsize, weight)
+    if len(lines) > max_lines:
+        lines = lines[:max_lines]
+        last = lines[-1]
+        while last and text_width(last + '…', fontsize, weight) > TEXT_WIDTH_PT:
+            last = last[:-1]
+        lines[-1] = last + '…'
+    return lines
+
+
+def split_title(title):
+    """「メイン｜サブ」形式のタイトルを (メイン, サブ) に分ける"""
+    for separator in ('｜', '|'):
+        if separator in title:
+            main, _, sub = title.partition(separator)
+            return main.strip(), sub.strip()
+    return title.strip(), ''
+
+
+class OgCardTemplate:
+    """OG 画像の図。固定部分は1回だけ作り、記事ごとに文字・色・位置だけを差し替える
+
+    図は pyplot に登録しない（閉じる必要が無い）。
+    """
+
+    def __init__(self):
+        self.fig = Figure(figsize=(OG_WIDTH / OG_DPI, OG_HEIGHT / OG_DPI), dpi=OG_DPI)
+        self.fig.patch.set_facecolor('#F8FAFC')
+        # 座標はピクセル単位（左上が原点）
+        ax = self.fig.add_axes([0, 0, 1, 1])
+        ax.set_xlim(0, OG_WIDTH)
+        ax.set_ylim(OG_HEIGHT, 0)
+        ax.axis('off')
+        self.ax = ax
+
+        # 固定部分: カード・左の帯・区切り線・サイト名
+        ax.add_patch(FancyBboxPatch((40, 40), OG_WIDTH - 80, OG_HEIGHT - 80,
+                                    boxstyle='round,pad=0,rounding_size=24',
+                                    facecolor='white', edgecolor='#E2E8F0', linewidth=1.5))
+        self.accent = ax.add_patch(Rectangle((40, 64), 14, OG_HEIGHT - 128, facecolor=DEFAULT_STYLE[1],
+                                             edgecolor='none'))
+        ax.plot([96, OG_WIDTH - 96], [500, 500], color='#E2E8F0', linewidth=1.5)
+        ax.text(OG_WIDTH - 96, 548, SITE_NAME, ha='right', va='center', fontsize=15,
+                fontweight='bold', color='#1E293B')
+        # タグ欄の幅（pt）: 左端 x=96 から、右揃えのサイト名の手前まで
+        self.tags_width = TEXT_WIDTH_PT - text_width(SITE_NAME, 15, 'bold') - TAGS_GAP_PT
+        ax.text(OG_WIDTH - 96, 582, SITE_DOMAIN, ha='right', va='center', fontsize=10, color='#64748B')
+
+        # 記事ごとに差し替える部分
+        self.category = ax.text(96, 108, '', ha='left', va='center', fontsize=12, fontweight='bold',
+                                color='white',
+                                bbox=dict(boxstyle='round,pad=0.45', facecolor=DEFAULT_STYLE[1], edgecolor='none'))
+        self.title = ax.text(96, 160, '', ha='left', va='top', fontweight='bold', color='#0F172A',
+                             linespacing=1.35)
+        self.subtitle = ax.text(96, 0, '', ha='left', va='top', fontsize=SUBTITLE_SIZE, color='#475569',
+                                linespacing=1.4)
+        self.tags = ax.text(96, 548, '', ha='left', va='center', fontsize=11, color='#64748B')
+
+    def update(self, article):
+        """記事の内容で文字・色・位置を差し替える"""
+        label, color = CATEGORY_STYLES.get(article['category'], DEFAULT_STYLE)
+        self.accent.set_facecolor(color)
+        self.category.set_text(label)
+        self.category.get_bbox_patch().set_facecolor(color)
+
+        main, sub = split_title(str(article['title']))
+        for size in TITLE_SIZES:
+            if len(wrap_lines(main, TEXT_WIDTH_PT, size, 'bold')) <= TITLE_MAX_LINES:
+                break
+        lines = fit_lines(main, size, TITLE_MAX_LINES, 'bold')
+        self.title.set_text('\n'.join(lines))
+        self.title.set_fontsize(size)
+
+        # サブタイトルはタイトルの行数に応じて位置を下げる（1pt = 150/72 px）
+        title_height = len(lines) * size * 1.35 * OG_DPI / 72
+        self.subtitle.set_position((96, 160 + title_height + 24))
+        self.subtitle.set_text('\n'.join(fit_lines(sub, SUBTITLE_SIZE, SUBTITLE_MAX_LINES)) if sub else '')
+
+        tags = []
+        values = article.get('tags') or []
+        # tags: が1つだけの文字列で書かれていても1文字ずつに分けない
+        for tag in [values] if isinstance(values, str) else values:
+            if text_width('  '.join(tags + [f'#{tag}']), 11) > self.tags_width:
+                break
+            tags.append(f'#{tag}')
+        self.tags.set_text('  '.join(tags))
+
+    def save(self, output_path):
+        return save_fixed_figure(self.fig, output_path, dpi=OG_DPI)
+
+
+def render_og_images(articles=None):
+    """記事の OG 画像をまとめて生成。保存した画像の情報（マニフェスト形式）を返す"""
+    from image_output import pop_saved_outputs
+
+    articles = load_articles() if articles is None else articles
+    pop_saved_outputs()
+    template = OgCardTemplate()
+    for article in articles:
+        template.update(article)
+        template.save(og_image_path(article['category'], article['slug']))
+    return pop_saved_outputs()
+
+
+if __name__ == "__main__":
+    patterns = sys.argv[1:]
+    articles = [a for a in load_articles()
+                if not patterns or any(p in f"{a['category']}/{a['slug']}" for p in patterns)]
+    print(f"OG画像を生成中（{len(articles)}件）...")
+    print()
+
+    start = time.perf_counter()
+    saved = render_og_images(articles)
+    images = image_manifest.load_manifest()
+    image_manifest.update_manifest(images, saved)
+    image_manifest.save_manifest(images)
+
+    print()
+    print(f"✅ OG画像を生成しました（{len(saved)}件、{time.perf_counter() - start:.1f}秒）")
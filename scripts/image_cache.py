@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+生成画像のインクリメンタルビルド用キャッシュ
+- キャッシュキー: 生成関数（と呼び出す関数）のソース、スクリプトのモジュールレベル設定（rcParams 等）、
+  ローカルの補助モジュール、matplotlibrc、フォントファイル、matplotlib のバージョン
+- キーが一致し、出力ファイルのハッシュも記録どおりなら再生成をスキップ
+- matplotlib を import せずに計算できるので、「何もすることがない」実行は一瞬で終わる
+"""
+import ast
+import hashlib
+import importlib.metadata
+import importlib.util
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+ROOT_DIR = SCRIPTS_DIR.parent
+CACHE_PATH = ROOT_DIR / '.cache' / 'image-build.json'
+
+# キャッシュのフォーマットを変えたときに上げる
+CACHE_VERSION = 1
+
+# フォントを探索するディレクトリ（matplotlib の font_manager と同じ考え方）
+FONT_DIRS = [
+    '/usr/share/fonts',
+    '/usr/local/share/fonts',
+    '~/.local/share/fonts',
+    '~/.fonts',
+    '/Library/Fonts',
+    '/System/Library/Fonts',
+    '~/Library/Fonts',
+]
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_digest(path):
+    """ファイル内容の SHA-256"""
+    return _sha256(Path(path).read_bytes())
+
+
+# ---------------------------------------------------------------------------
+# キー計算
+# ---------------------------------------------------------------------------
+
+_module_index = {}
+
+
+def clear_index():
+    """解析済みのスクリプトを破棄する（ウォッチモードでファイルが変わったとき）"""
+    _module_index.clear()
+
+
+def _split_lines(source):
+    """ast.get_source_segment と同じ規則（CR LF・CR・LF だけ）で行に分ける（改行文字は残す）"""
+    return re.findall(r'[^\r\n]*(?:\r\n|\r|\n)|[^\r\n]+$', source)
+
+
+def _segment(index, node):
+    """ノードのソース（ast.get_source_segment と同じ結果）
+
+    get_source_segment は呼ぶたびにファイル全体を行に分けるので、行の分割は解析時に1回だけ行う。
+    列位置は UTF-8 のバイト単位。
+    """
+    lines = index['lines']
+    first, last = node.lineno - 1, node.end_lineno - 1
+    if first == last:
+        return lines[first].encode()[node.col_offset:node.end_col_offset].decode()
+    return (lines[first].encode()[node.col_offset:].decode() + ''.join(lines[first + 1:last])
+            + lines[last].encode()[:node.end_col_offset].decode())
+
+
+def index_module(module):
+    """スクリプトを解析し、関数ごとのソースとモジュールレベル設定をまとめる（モジュールごとに1回）
+
+    image_registry の生成関数の列挙も、この解析結果（'functions'）を使う。
+    """
+    if module in _module_index:
+        return _module_index[module]
+
+    source = (SCRIPTS_DIR / f'{module}.py').read_text(encoding='utf-8')
+    tree = ast.parse(source)
+    index = {'source': source, 'lines': _split_lines(source)}
+    functions = {}
+    preamble = []
+    local_imports = []
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef):
+            functions[node.name] = node
+            continue
+        # if __name__ == "__main__": ブロックは出力に影響しない
+        if isinstance(node, ast.If) and '__main__' in ast.unparse(node.test):
+            continue
+        preamble.append(_segment(index, node))
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            names = [node.module] if isinstance(node, ast.ImportFrom) else [a.name for a in node.names]
+            local_imports += [n for n in names if n and (SCRIPTS_DIR / f'{n}.py').exists()]
+
+    index.update({
+        'functions': functions,
+        'preamble': '\n'.join(preamble),
+        'local_imports': sorted(set(local_imports)),
+    })
+    _module_index[module] = index
+    return index
+
+
+def _function_sources(index, name, seen=None):
+    """関数自身と、その関数が呼び出すモジュール内関数のソースを再帰的に集める"""
+    seen = set() if seen is None else seen
+    if name in seen or name not in index['functions']:
+        return []
+    seen.add(name)
+    node = index['functions'][name]
+    sources = [_segment(index, node)]
+    for child in ast.walk(node):
+        if isinstance(child, ast.Name) and child.id in index['functions']:
+            sources += _function_sources(index, child.id, seen)
+    return sources
+
+
+def _package_version(name):
+    try:
+        return importlib.metadata.version(name)
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+def _matplotlibrc_files():
+    """出力に影響する matplotlibrc の候補"""
+    candidates = []
+    if os.environ.get('MATPLOTLIBRC'):
+        candidates.append(Path(os.environ['MATPLOTLIBRC']))
+    candidates.append(Path.cwd() / 'matplotlibrc')
+    config_dir = os.environ.get('MPLCONFIGDIR') or Path.home() / '.config' / 'matplotlib'
+    candidates.append(Path(config_dir) / 'matplotlibrc')
+    if sys.platform == 'darwin':
+        candidates.append(Path.home() / '.matplotlib' / 'matplotlibrc')
+    return [p for p in candidates if p.is_file()]
+
+
+def font_dirs():
+    """フォントを探すディレクトリ（存在するものだけ。image_fonts の解決結果のキーにも使う）"""
+    dirs = [Path(d).expanduser() for d in FONT_DIRS]
+    # japanize_matplotlib 同梱の IPAexGothic（import せずに場所だけ調べる）
+    spec = importlib.util.find_spec('japanize_matplotlib')
+    if spec and spec.origin:
+        dirs.append(Path(spec.origin).parent / 'fonts')
+    return [d for d in dirs if d.is_dir()]
+
+
+_environment_digest = None
+
+
+def environment_digest():
+    """全生成関数に共通する環境（ライブラリ・rc ファイル・フォント）のハッシュ"""
+    global _environment_digest
+    if _environment_digest is not None:
+        return _environment_digest
+
+    h = hashlib.sha256()
+    for package in ('matplotlib', 'japanize-matplotlib', 'numpy', 'pillow'):
+        h.update(f'{package}={_package_version(package)}\n'.encode())
+    for rc_file in _matplotlibrc_files():
+        h.update(f'rc:{rc_file}:{file_digest(rc_file)}\n'.encode())
+    # フォントは数が多いので内容ではなくパス・サイズ・更新時刻で判定
+    for font_dir in font_dirs():
+        for path in sorted(font_dir.rglob('*')):
+            if path.suffix.lower() in ('.ttf', '.otf', '.ttc', '.afm'):
+                stat = path.stat()
+                h.update(f'font:{path}:{stat.st_size}:{stat.st_mtime_ns}\n'.encode())
+
+    _environment_digest = h.hexdigest()
+    return _environment_digest
+
+
+def job_key(module, function, spec=None, options=None):
+    """生成関数のキャッシュキー（spec は入力となる定義ファイル、options は出力設定）"""
+    index = index_module(module)
+    h = hashlib.sha256()
+    h.update(f'v{CACHE_VERSION}\n{module}.{function}\n'.encode())
+    h.update(json.dumps(options or {}, sort_keys=True).encode())
+    if spec:
+        h.update(f'{spec}:{file_digest(ROOT_DIR / spec)}\n'.encode())
+    h.update(environment_digest().encode())
+    h.update(index['preamble'].encode())
+    for source in _function_sources(index, function):
+        h.update(source.encode())
+    for helper in local_dependencies(module):
+        h.update(helper.encode())
+        h.update(index_module(helper)['source'].encode())
+    return h.hexdigest()
+
+
+def local_dependencies(module):
+    """スクリプトが（間接的にも）import している scripts/ 内の補助モジュール"""
+    found = []
+    pending = list(index_module(module)['local_imports'])
+    while pending:
+        name = pending.pop()
+        if name in found or name == module:
+            continue
+        found.append(name)
+        pending += index_module(name)['local_imports']
+    return sorted(found)
+
+
+# ---------------------------------------------------------------------------
+# キャッシュファイル
+# ---------------------------------------------------------------------------
+
+def load_cache(path=CACHE_PATH):
+    try:
+        data = json.loads(Path(path).read_text(encoding='utf-8'))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if data.get('version') != CACHE_VERSION:
+        return {}
+    return data.get('entries', {})
+
+
+def save_cache(entries, path=CACHE_PATH):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {'version': CACHE_VERSION, 'entries': entries}
+    path.write_text(json.dumps(data, ensure_ascii=False, indent=2, sort_keys=True) + '\n', encoding='utf-8')
+
+
+def is_fresh(entries, name, key):
+    """キーが一致し、出力ファイルが記録時のまま残っていれば True"""
+    entry = entries.get(name)
+    if not entry or entry.get('key') != key or not entry.get('outputs'):
+        return False
+    for output, digest in entry['outputs'].items():
+        path = ROOT_DIR / output
+        if not path.is_file() or file_digest(path) != digest:
+            return False
+    return True
+
+
+def record(entries, name, key, outputs):
+    """生成結果をキャッシュに登録"""
+    entries[name] = {
+        'key': key,
+        'outputs': {str(output): file_digest(ROOT_DIR / output) for output in outputs},
+    }
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+日本語フォントの設定（全スクリプト共通、プロセスごとに1回だけ解決）
+- japanize_matplotlib 同梱の IPAexGothic を、japanize_matplotlib を import せずに登録する
+  （import すると distutils の読み込みだけで約70ms かかる。フォントの場所だけを find_spec で調べる）
+- font.family を [IPAexGothic, DejaVu Sans] に固定する。Hiragino Sans など macOS / Windows の
+  フォントを順に探さないので、どのマシンでも同じフォントで描画される。
+  IPAexGothic に無い文字（≤ ≥ など）は DejaVu Sans で描画する（text_wrap の幅計測と同じ）
+- IPAexGothic には太字が無いので、同じファイルを太字としても登録する
+  （findfont が文字サイズごとに「Failed to find font weight bold」と警告しながら全フォントを探し直さない）
+- 解決結果（FontEntry）は .cache/font-resolution.json に保存し、matplotlib のバージョンと
+  フォントディレクトリの更新時刻が同じなら、次回はフォントファイルを開かずに登録する
+- 同梱フォントが無い環境では、従来の候補（FALLBACK_FAMILIES）から最初に見つかったものを使う
+
+各スクリプトは import matplotlib の後で setup_fonts() を呼ぶ
+（build_images.py のワーカーは起動時に呼んでおく）。
+"""
+import dataclasses
+import importlib.util
+import json
+import os
+from pathlib import Path
+
+import matplotlib
+from matplotlib import font_manager
+
+import image_cache
+from image_manifest import ROOT_DIR, atomic_write
+
+RESOLUTION_PATH = ROOT_DIR / '.cache' / 'font-resolution.json'
+RESOLUTION_VERSION = 1
+
+# japanize_matplotlib 同梱のフォント
+BUNDLED_FONT = Path('fonts') / 'ipaexg.ttf'
+# 同梱フォントが無い場合に探す日本語フォント（優先順）
+FALLBACK_FAMILIES = ['Hiragino Sans', 'Yu Gothic', 'Meirio', 'Takao', 'IPAexGothic', 'IPAPGothic']
+# 日本語フォントに無い文字を描画するフォント（matplotlib 同梱）
+SYMBOL_FAMILY = 'DejaVu Sans'
+
+BOLD_WEIGHT = 700
+
+# このプロセスで解決済みのフォント名
+_family = None
+
+
+def _bundled_font():
+    spec = importlib.util.find_spec('japanize_matplotlib')
+    if spec is None or not spec.origin:
+        return None
+    path = Path(spec.origin).parent / BUNDLED_FONT
+    return path if path.is_file() else None
+
+
+def resolution_key():
+    """解決結果が使えるかどうかの判定に使う値（matplotlib のバージョンとフォントディレクトリの更新時刻）"""
+    mtimes = {}
+    for font_dir in image_cache.font_dirs():
+        for directory, _, _ in os.walk(font_dir):
+            mtimes[directory] = os.stat(directory).st_mtime_ns
+    return {'matplotlib': matplotlib.__version__, 'dirs': mtimes}
+
+
+def _resolve():
+    """日本語フォントを実際のファイルに解決し、登録する FontEntry のリストを返す"""
+    path = _bundled_font()
+    if path is not None:
+        entries = [font_manager.ttfFontProperty(font_manager.get_font(str(path)))]
+    else:
+        available = {entry.name: entry for entry in font_manager.fontManager.ttflist}
+        family = next((name for name in FALLBACK_FAMILIES if name in available), None)
+        if family is None:
+            return []
+        entries = [available[family]]
+    family = entries[0].name
+    # 太字が無ければ、同じファイルを太字として登録する（描画結果は太字指定が無視される現状と同じ）
+    if not any(e.name == family and e.weight >= BOLD_WEIGHT for e in font_manager.fontManager.ttflist):
+        entries.append(dataclasses.replace(entries[0], weight=BOLD_WEIGHT))
+    return entries
+
+
+def _load_entries(key):
+    """保存済みの解決結果（キーが一致し、フォントファイルが残っている場合だけ）"""
+    try:
+        data = json.loads(RESOLUTION_PATH.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+    if data.get('version') != RESOLUTION_VERSION or data.get('key') != key:
+        return None
+    entries = [font_manager.FontEntry(**fields) for fields in data['entries']]
+    if not entries or not all(os.path.isfile(entry.fname) for entry in entries):
+        return None
+    return entries
+
+
+def _save_entries(key, entries):
+    data = {'version': RESOLUTION_VERSION, 'key': key, 'entries': [dataclasses.asdict(e) for e in entries]}
+    try:
+        atomic_write(RESOLUTION_PATH, (json.dumps(data, ensure_ascii=False, indent=2) + '\n').encode('utf-8'))
+    except OSError:
+        # 書き込めない場所（読み取り専用のチェックアウトなど）でも描画は続ける
+        pass
+
+
+def setup_fonts():
+    """日本語フォントを登録して rcParams の font.family を固定し、フォント名を返す"""
+    global _family
+    if _family is None:
+        key = resolution_key()
+        entries = _load_entries(key)
+        if entries is None:
+            entries = _resolve()
+            if entries:
+                _save_entries(key, entries)
+        manager = font_manager.fontManager
+        registered = {(entry.fname, entry.name, entry.weight) for entry in manager.ttflist}
+        for entry in entries:
+            if (entry.fname, entry.name, entry.weight) not in registered:
+                manager.ttflist.append(entry)
+        # フォント一覧を変えたので findfont のキャッシュを捨てる（addfont と同じ）。
+        # キャッシュは matplotlib の非公開属性なので、無いバージョンでは公開 API の addfont に任せる
+        cache_clear = getattr(getattr(manager, '_findfont_cached', None), 'cache_clear', None)
+        if cache_clear is not None:
+            cache_clear()
+        elif entries:
+            manager.addfont(entries[0].fname)
+        _family = entries[0].name if entries else 'sans-serif'
+    matplotlib.rcParams['font.family'] = [_family, SYMBOL_FAMILY]
+    return _family
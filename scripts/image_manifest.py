@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+生成画像の出力マニフェスト
+- 一時ファイルに書いてから rename するアトミックな書き込み
+- 画像ごとのパス・バイト数・ピクセルサイズ・内容ハッシュを data/image-manifest.json に記録
+  （同名の WebP / AVIF / SVG があれば variants として各サイズも記録）
+  （幅違いの縮小版 <名前>-480w.png などがあれば sizes と、形式ごとの srcset も記録）
+  （生成した直後は、その実行で書き出したファイルだけを記録する。以前の実行の残りは載せない）
+  （Next.js のビルドは PNG を読み直さずにこのファイルだけを参照する）
+- matplotlib を import しないので、ビルドランナーの親プロセスからも軽く使える
+"""
+import hashlib
+import json
+import os
+import re
+import struct
+import tempfile
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+ROOT_DIR = SCRIPTS_DIR.parent
+PUBLIC_DIR = ROOT_DIR / 'public'
+MANIFEST_PATH = ROOT_DIR / 'data' / 'image-manifest.json'
+
+MANIFEST_VERSION = 1
+
+# PNG と同じ場所に拡張子違いで出力される形式
+VARIANT_FORMATS = ('webp', 'avif', 'svg')
+
+# レスポンシブ画像として出力する幅（px）。元画像より狭いものだけ出力する
+RESPONSIVE_WIDTHS = (480, 768, 1200, 2000)
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+def atomic_write(path, data):
+    """同じディレクトリの一時ファイルに書き込んでから置き換える"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def png_dimensions(data):
+    """PNG の IHDR チャンクから (幅, 高さ) を読む（画像のデコードはしない）"""
+    if data[:8] != PNG_SIGNATURE or data[12:16] != b'IHDR':
+        raise ValueError('PNG ではありません')
+    return struct.unpack('>II', data[16:24])
+
+
+def url_path(path):
+    """出力パスをサイト上のURLパスに変換（public/bridge/images/x.png → /bridge/images/x.png）"""
+    path = (ROOT_DIR / path).resolve()
+    return '/' + path.relative_to(PUBLIC_DIR).as_posix()
+
+
+def size_variant_path(path, width):
+    """幅違いの縮小版のパス（x.png → x-480w.png）"""
+    path = Path(path)
+    return path.with_name(f'{path.stem}-{width}w{path.suffix}')
+
+
+def _size_variant_paths(full_path):
+    """ディスク上にある縮小版 PNG を幅の昇順で返す"""
+    pattern = re.compile(re.escape(full_path.stem) + r'-(\d+)w\.png')
+    found = []
+    for candidate in full_path.parent.glob(f'{full_path.stem}-*w.png'):
+        match = pattern.fullmatch(candidate.name)
+        if match:
+            found.append((int(match.group(1)), candidate))
+    return [candidate for _, candidate in sorted(found)]
+
+
+def _srcset(entries):
+    """各形式の srcset 文字列（すべての幅が揃っている形式だけ）"""
+    srcset = {}
+    for fmt in ('png',) + VARIANT_FORMATS:
+        candidates = []
+        for entry in entries:
+            path = entry['path'] if fmt == 'png' else entry.get('variants', {}).get(fmt, {}).get('path')
+            if path is None:
+                break
+            candidates.append(f"{url_path(path)} {entry['width']}w")
+        else:
+            srcset[fmt] = ', '.join(candidates)
+    return srcset
+
+
+def describe(path, data=None, sizes=True, root=ROOT_DIR, emitted=None):
+    """マニフェストに載せる1画像分の情報
+
+    パスは root（既定はリポジトリ直下）からの相対パスで記録する。
+    emitted はこの実行で書き出したファイル {PNG のパス: [PNG 以外の形式]}（原寸と縮小版）。
+    指定すると variants / sizes はその中からだけ作る。None ならディスク上のファイルを調べる
+    （今回生成しなかった画像の補完用）。
+    """
+    root = Path(root).resolve()
+    if emitted is not None:
+        emitted = {(root / p).resolve(): list(fmts) for p, fmts in emitted.items()}
+    path = Path(path)
+    if data is None:
+        data = (root / path).read_bytes()
+    width, height = png_dimensions(data)
+    full_path = (root / path).resolve()
+    entry = {
+        'path': full_path.relative_to(root).as_posix(),
+        'bytes': len(data),
+        'width': width,
+        'height': height,
+        'sha256': hashlib.sha256(data).hexdigest(),
+    }
+    variants = {}
+    for fmt in VARIANT_FORMATS:
+        sibling = full_path.with_suffix(f'.{fmt}')
+        if fmt in emitted.get(full_path, ()) if emitted is not None else sibling.is_file():
+            variants[fmt] = {
+                'path': sibling.relative_to(root).as_posix(),
+                'bytes': sibling.stat().st_size,
+            }
+    if variants:
+        entry['variants'] = variants
+    if sizes:
+        if emitted is not None:
+            size_paths = [p for p in _size_variant_paths(full_path) if p.resolve() in emitted]
+        else:
+            size_paths = _size_variant_paths(full_path)
+        size_entries = [describe(p, sizes=False, root=root, emitted=emitted) for p in size_paths]
+        size_entries = [e for e in size_entries if e['width'] < width]
+        if size_entries:
+            entry['sizes'] = size_entries
+            entry['srcset'] = _srcset(size_entries + [entry])
+    return entry
+
+
+def output_files(entry):
+    """マニフェストの1項目に含まれる全ファイルのパス（PNG + 各形式 + 縮小版）"""
+    files = [entry['path']] + [v['path'] for v in entry.get('variants', {}).values()]
+    for size in entry.get('sizes', []):
+        files.extend(output_files(size))
+    return files
+
+
+def load_manifest(path=MANIFEST_PATH):
+    try:
+        data = json.loads(Path(path).read_text(encoding='utf-8'))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if data.get('version') != MANIFEST_VERSION:
+        return {}
+    return data.get('images', {})
+
+
+def save_manifest(images, path=MANIFEST_PATH):
+    data = {'version': MANIFEST_VERSION, 'images': dict(sorted(images.items()))}
+    text = json.dumps(data, ensure_ascii=False, indent=2) + '\n'
+    atomic_write(path, text.encode('utf-8'))
+
+
+def update_manifest(images, described, known_outputs=()):
+    """生成結果を反映し、記載漏れ・消えたファイルを整理する
+
+    described は今回の生成で得た情報（ワーカーから受け取ったもの）。
+    known_outputs は生成関数が出力しうる全パスで、今回生成しなかった画像も
+    マニフェストに無ければファイルから情報を補う。
+    """
+    for info in described:
+        images[url_path(info['path'])] = {k: v for k, v in info.items() if k != 'stats'}
+    for output in known_outputs:
+        file_path = ROOT_DIR / output
+        if not file_path.is_file() or not str(file_path.resolve()).startswith(str(PUBLIC_DIR)):
+            continue
+        entry = images.get(url_path(output))
+        if entry is None or entry['bytes'] != file_path.stat().st_size:
+            images[url_path(output)] = describe(output)
+    for key in [k for k, v in images.items() if not (ROOT_DIR / v['path']).is_file()]:
+        del images[key]
+    return images
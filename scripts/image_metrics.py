@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+生成ジョブの計測（ワーカープロセス内で使用）
+- フェーズごとの経過時間（import / build / tight_layout / draw / encode / write）
+  build は生成関数の実行時間から他のフェーズを除いた、図の組み立てにかかった時間
+- プロセスの最大 RSS と、tracemalloc が有効ならジョブ中の Python ヒープのピーク
+- 保存した図ごとのアーティスト数（Text / Patch / Line2D / Collection）とピクセルサイズ
+
+build_images.py がジョブの開始・終了を呼び、image_output が描画・エンコード・書き込みを
+phase() で囲む。計測は標準ライブラリだけで行う。
+計測値はスレッドごとに持つ（build_images.py --threads では1スレッドが1ジョブずつ実行する）。
+RSS と tracemalloc のピークはプロセス全体の値。
+"""
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+PHASES = ('import', 'build', 'tight_layout', 'draw', 'encode', 'write')
+
+# 実行中のジョブの計測値（スレッドごと）
+_local = threading.local()
+
+
+def _current():
+    current = getattr(_local, 'current', None)
+    if current is None:
+        current = _local.current = {'phases': {}, 'figures': [], 'rss_start_kb': max_rss_kb()}
+    return current
+
+
+def max_rss_kb():
+    """このプロセスの最大 RSS（KB）。macOS の ru_maxrss はバイト単位"""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+
+def start_job():
+    """ジョブ開始時に計測値をリセット"""
+    _local.current = {'phases': dict.fromkeys(PHASES, 0.0), 'figures': [], 'rss_start_kb': max_rss_kb()}
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+
+
+@contextmanager
+def phase(name):
+    """囲んだ区間の経過時間をフェーズ name に加算"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases = _current()['phases']
+        phases[name] = phases.get(name, 0.0) + time.perf_counter() - start
+
+
+def count_artists(fig):
+    """図に含まれる（表示される）アーティストを種類別に数える
+
+    figure_template で使い回して非表示にしているアーティストは数えない。
+    """
+    from matplotlib.collections import Collection
+    from matplotlib.lines import Line2D
+    from matplotlib.patches import Patch
+    from matplotlib.text import Text
+
+    kinds = {'text': Text, 'patch': Patch, 'line': Line2D, 'collection': Collection}
+    counts = dict.fromkeys(kinds, 0)
+    artists = [artist for artist in fig.findobj() if artist.get_visible()]
+    for artist in artists:
+        for name, kind in kinds.items():
+            if isinstance(artist, kind):
+                counts[name] += 1
+                break
+    counts['total'] = len(artists)
+    return counts
+
+
+def record_figure(fig, path, size):
+    """保存した図の情報を記録（size は出力画像の (幅, 高さ)）"""
+    width, height = fig.get_size_inches()
+    _current()['figures'].append({
+        'path': str(path),
+        'figsize': [round(width, 2), round(height, 2)],
+        'pixels': list(size),
+        'artists': count_artists(fig),
+    })
+
+
+def finish_job(run_elapsed):
+    """ジョブ終了時の計測値。run_elapsed は生成関数の実行時間"""
+    current = _current()
+    phases = current['phases']
+    measured = sum(v for k, v in phases.items() if k not in ('import', 'build'))
+    phases['build'] = max(0.0, run_elapsed - measured)
+    metrics = {
+        'phases': {k: round(v, 4) for k, v in phases.items()},
+        'max_rss_kb': max_rss_kb(),
+        'rss_growth_kb': max_rss_kb() - current['rss_start_kb'],
+        'figures': list(current['figures']),
+    }
+    if tracemalloc.is_tracing():
+        metrics['tracemalloc_peak_kb'] = tracemalloc.get_traced_memory()[1] // 1024
+    return metrics
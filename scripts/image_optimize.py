@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+生成画像（PNG）のサイズ最適化
+- 背景が白の不透明画像なのでアルファチャンネルを除去（RGBA → RGB）
+- 単色の箱と文字が中心の図は 256 色パレットに減色
+- 減色による見た目の変化（RMS 誤差）がしきい値を超える場合は減色せずロスレスのまま
+- 最大圧縮で再エンコード（zopfli がインストールされていれば zopfli で再圧縮）
+
+Pillow は matplotlib の依存パッケージなので追加インストールは不要。
+ビルドランナーの親プロセスが定数だけ参照できるよう、Pillow は関数内で import する。
+"""
+import io
+
+# 減色後の RMS 誤差（0〜255）の上限。これを超えたらパレット化しない
+DEFAULT_MAX_ERROR = 2.0
+PALETTE_COLORS = 256
+
+
+def _zopfli_png():
+    """zopfli（任意）の PNG 再圧縮モジュール。無ければ None"""
+    try:
+        from zopfli import png
+    except ImportError:
+        return None
+    return png
+
+
+def _encode_png(image):
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG', optimize=True, compress_level=9)
+    return buffer.getvalue()
+
+
+def flatten(image, background=(255, 255, 255)):
+    """アルファチャンネルを背景色と合成して RGB にする"""
+    from PIL import Image
+
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        flat = Image.new('RGB', image.size, background)
+        flat.paste(image, mask=image.getchannel('A'))
+        return flat
+    return image.convert('RGB')
+
+
+def rms_error(a, b):
+    """2画像の RMS 誤差（チャンネル平均、0〜255）"""
+    from PIL import ImageChops, ImageStat
+
+    stat = ImageStat.Stat(ImageChops.difference(a, b))
+    return (sum(v * v for v in stat.rms) / len(stat.rms)) ** 0.5
+
+
+def quantize(image, max_error=DEFAULT_MAX_ERROR):
+    """パレット化した画像と誤差を返す。しきい値を超えたら (None, 誤差)"""
+    from PIL import Image
+
+    paletted = image.quantize(colors=PALETTE_COLORS, method=Image.Quantize.MEDIANCUT,
+                              dither=Image.Dither.NONE)
+    error = rms_error(image, paletted.convert('RGB'))
+    if error > max_error:
+        return None, error
+    return paletted, error
+
+
+def resize(image, width):
+    """幅 width に縮小（縦横比を維持、Lanczos で再サンプリング）"""
+    from PIL import Image
+
+    height = max(1, round(image.height * width / image.width))
+    return image.resize((width, height), Image.Resampling.LANCZOS)
+
+
+def format_bytes(size):
+    """バイト数を KB / MB 表記に"""
+    if size >= 1024 * 1024:
+        return f'{size / 1024 / 1024:.2f}MB'
+    return f'{size / 1024:.1f}KB'
+
+
+# ---------------------------------------------------------------------------
+# PNG 以外の形式
+# ---------------------------------------------------------------------------
+
+# WebP は文字のにじみを避けるためロスレス、AVIF はロスレスだと PNG より大きくなりやすいので高画質の非可逆
+# （減色した図ではロスレス WebP の方が小さいことが多い。image_output は小さくならない AVIF を出力しない）
+WEBP_OPTIONS = {'lossless': True, 'method': 4, 'quality': 80}
+AVIF_OPTIONS = {'quality': 70, 'speed': 8, 'subsampling': '4:4:4'}
+
+
+def available_formats():
+    """この環境でエンコードできる形式"""
+    from PIL import features
+
+    formats = ['png']
+    if features.check('webp'):
+        formats.append('webp')
+    if features.check('avif'):
+        formats.append('avif')
+    else:
+        try:
+            import pillow_avif  # noqa: F401  （Pillow 11.3 未満向けのプラグイン）
+            formats.append('avif')
+        except ImportError:
+            pass
+    return formats
+
+
+def encode_formats(image, formats, optimize=True, max_error=DEFAULT_MAX_ERROR):
+    """RGBA 画像を複数形式にエンコード。戻り値は {形式: (データ, 情報)}
+
+    減色は1回だけ行い、PNG とロスレス WebP で共用する（パレット画像の WebP は
+    フルカラーより大幅に小さい。縮小版は再サンプリングで中間色が増えるので特に効く）。
+    """
+    rgb = flatten(image)
+    paletted, error = quantize(rgb, max_error) if optimize else (None, 0.0)
+    lossless = paletted if paletted is not None else rgb
+    encoded = {}
+    for fmt in formats:
+        if fmt == 'png':
+            data = _encode_png(lossless)
+            zopfli_png = _zopfli_png()
+            if optimize and zopfli_png is not None:
+                data = zopfli_png.optimize(data)
+            encoded[fmt] = data, {'paletted': paletted is not None, 'error': round(error, 3)}
+            continue
+        buffer = io.BytesIO()
+        if fmt == 'webp':
+            lossless.save(buffer, format='WEBP', **WEBP_OPTIONS)
+        elif fmt == 'avif':
+            rgb.save(buffer, format='AVIF', **AVIF_OPTIONS)
+        else:
+            raise ValueError(f'未対応の形式: {fmt}')
+        encoded[fmt] = buffer.getvalue(), {}
+    return encoded
+
+
+def encode_baseline_png(image):
+    """最適化前の比較用 PNG（matplotlib の savefig 相当: RGBA・zlib 既定レベル）"""
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG', compress_level=6)
+    return buffer.getvalue()
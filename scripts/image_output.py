@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+生成画像の共通出力処理
+- 図は1回だけ RGBA バッファに描画し、PNG / WebP / AVIF を並列にエンコード
+  （形式ごとに matplotlib を再描画しない）
+- AVIF（非可逆）は、原寸でロスレスの PNG / WebP より小さくなった画像だけ出力する
+- 同じバッファを Lanczos で縮小して 480 / 768 / 1200 / 2000px 幅のレスポンシブ版も出力
+  （x.png → x-480w.png など。元画像より十分に狭く、どの形式でも1つ上の幅よりファイルが小さいものだけ。
+  configure(prune=True) なら、今回出力しなかった幅の古いファイルは削除する）
+- 既存ファイルとバイト単位で同一なら書き換えない
+- configure(prune=True)（build_images.py）なら、今回出力しなかった形式の古いファイル
+  （--svg なしで再生成したときの x.svg など）は削除し、マニフェストにも載せない
+  （スクリプト単体の実行はマニフェストを更新しないので、ビルドが出力したファイルを消さない）
+- 相対パスはリポジトリ直下（public/<カテゴリ>/images/...）を基準に解決
+- 一時ファイル + rename のアトミックな書き込み
+- 出力した画像の情報を記録（build_images.py のキャッシュ・マニフェスト登録に使用）
+- PNG は image_optimize で減色・再圧縮（configure(optimize=False) で無効化）
+- 描画・エンコード・書き込み・tight_layout の時間とアーティスト数を image_metrics に記録
+- configure(svg=True) で、サブセットフォントを埋め込んだ SVG も出力（image_svg）
+- 文字列の寸法は text_metrics の永続キャッシュから取り、図・実行をまたいで測り直さない
+- 軸を表示しない図は決まった余白で1回だけ配置し、tight_layout と描画後の切り抜きを省く
+  （configure(layout='tight') で従来の tight_layout + 切り抜きに戻せる）
+- add_inspector() で、描画直後の図を調べる関数を登録できる（check_images.py の重なり検出）。
+  configure(render_only=True) なら描画と検査だけを行い、エンコード・書き込みはしない
+- new_figure() は pyplot を通さずに Figure + FigureCanvasAgg を作る（plt.subplots の代わり）。
+  pyplot の図の管理・バックエンドの自動選択を使わないので、閉じ忘れた図が残らず、
+  別々の図なら複数のスレッドから同時に描画できる
+"""
+import math
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import matplotlib
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+import image_metrics
+import text_metrics
+from image_manifest import (RESPONSIVE_WIDTHS, ROOT_DIR, VARIANT_FORMATS, atomic_write, describe,
+                            size_variant_path)
+from image_optimize import DEFAULT_MAX_ERROR, encode_baseline_png, encode_formats, resize
+from image_svg import render_svg
+
+# この実行中に save_figure が出力した画像の情報（image_manifest.describe の形式 + 'stats'）。
+# スレッドごとに記録する（build_images.py --threads では1スレッドが1ジョブずつ実行する）
+_local = threading.local()
+
+# 出力設定（build_images.py がワーカー起動時に configure で上書きする）
+_options = {
+    'optimize': True,
+    'max_error': DEFAULT_MAX_ERROR,
+    'formats': ['png'],
+    'widths': list(RESPONSIVE_WIDTHS),
+    'svg': False,
+    # 出力先の基準ディレクトリ（None ならリポジトリ直下。ベンチマークは一時ディレクトリを指定する）
+    'output_root': None,
+    # 'fixed': 軸を表示しない図は tight_layout を使わず決まった余白で配置し、描画後の切り抜きもしない
+    # 'tight': すべての図で tight_layout + 内容部分の切り抜き（従来どおり）
+    'layout': 'fixed',
+    # True なら描画して inspector に渡すだけで、ファイルを出力しない（check_images.py）
+    'render_only': False,
+    # True なら今回出力しなかった形式・幅のファイルを消す。出力する形式・幅を決めて
+    # マニフェストも更新する build_images.py だけが有効にする（スクリプト単体の実行では消さない）
+    'prune': False,
+}
+
+# 描画直後の図を受け取る関数（fig, output_path, crop）。add_inspector で登録する
+_inspectors = []
+
+# bbox_inches='tight' と同じ余白（インチ）
+TIGHT_PAD_INCHES = 0.1
+
+# 元画像の幅に対してこの割合を超える幅の縮小版は作らない（ほぼ原寸で、バイト数が減らないため）
+MAX_SIZE_RATIO = 0.9
+
+# エンコードに使うスレッド数の上限（原寸 + 縮小版の数だけ使う）
+ENCODE_THREADS = 8
+
+
+def configure(**options):
+    """出力設定を変更"""
+    unknown = set(options) - set(_options)
+    if unknown:
+        raise ValueError(f'不明な出力設定: {sorted(unknown)}')
+    _options.update(options)
+
+
+def output_options():
+    """現在の出力設定（キャッシュキーに含める）"""
+    return dict(_options)
+
+
+def _saved_outputs():
+    if not hasattr(_local, 'saved_outputs'):
+        _local.saved_outputs = []
+    return _local.saved_outputs
+
+
+def pop_saved_outputs():
+    """このスレッドで記録済みの出力情報を取り出してリセット"""
+    outputs = list(_saved_outputs())
+    _local.saved_outputs = []
+    return outputs
+
+
+def add_inspector(inspector):
+    """描画直後の図を調べる関数を登録する。inspector(fig, output_path, crop) の形で呼ばれる
+
+    crop は描画後に内容部分を切り抜くかどうか（False なら図の外にはみ出した部分は出力されない）。
+    """
+    _inspectors.append(inspector)
+
+
+def remove_inspector(inspector):
+    _inspectors.remove(inspector)
+
+
+def _inspect(fig, output_path, crop):
+    for inspector in _inspectors:
+        inspector(fig, output_path, crop)
+
+
+def new_figure(nrows=1, ncols=1, figsize=None, dpi=None, **kwargs):
+    """plt.subplots と同じ引数で (fig, ax) を返す。図は pyplot に登録しない（Agg で描画する）
+
+    pyplot の図と違って閉じる必要はなく、参照が無くなれば破棄される。
+    """
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    return fig, fig.subplots(nrows, ncols, **kwargs)
+
+
+def close_figure(fig):
+    """pyplot で作った図なら pyplot の管理から外す（new_figure の図は何もしない）"""
+    pyplot = sys.modules.get('matplotlib.pyplot')
+    if pyplot is not None and fig.canvas.manager is not None:
+        pyplot.close(fig)
+
+
+def close_all_figures():
+    """pyplot で作られた図をすべて閉じる（pyplot が読み込まれていなければ何もしない）"""
+    pyplot = sys.modules.get('matplotlib.pyplot')
+    if pyplot is not None:
+        pyplot.close('all')
+
+
+def _uses_fixed_layout(fig):
+    """layout='fixed' の対象か（軸をすべて非表示にした、座標を決め打ちした図）"""
+    return _options['layout'] == 'fixed' and bool(fig.axes) and not any(ax.axison for ax in fig.axes)
+
+
+def layout_figure(fig, pad=1.08, **kwargs):
+    """fig.tight_layout の計測付き版（plt.tight_layout の代わりに使う）
+
+    layout='fixed' では、軸を表示しない図は文字の範囲を計算せず、図の端から pad（文字サイズ単位、
+    tight_layout と同じ）だけ空けて Axes を配置する。軸のあるグラフは従来どおり tight_layout。
+    """
+    with image_metrics.phase('tight_layout'):
+        if not _uses_fixed_layout(fig):
+            if hasattr(fig.canvas, 'get_renderer'):
+                text_metrics.install(fig.canvas.get_renderer())
+            fig.tight_layout(pad=pad, **kwargs)
+            return
+        margin = pad * matplotlib.rcParams['font.size'] / 72
+        width, height = fig.get_size_inches()
+        fig.subplots_adjust(left=margin / width, right=1 - margin / width,
+                            bottom=margin / height, top=1 - margin / height)
+
+
+def render_rgba(fig, dpi=150, facecolor='white', crop=True):
+    """図を1回だけ描画し、内容部分（tight bbox + 余白）を切り出した RGBA 画像を返す
+
+    savefig(bbox_inches='tight') は範囲計算のための描画と本描画の2回を行うが、
+    ここでは本描画1回のバッファから切り出す。crop=False なら図全体をそのまま返す。
+    """
+    from PIL import Image
+
+    fig.set_dpi(dpi)
+    fig.patch.set_facecolor(facecolor)
+    canvas = fig.canvas if isinstance(fig.canvas, FigureCanvasAgg) else FigureCanvasAgg(fig)
+    text_metrics.install(canvas.get_renderer())
+    canvas.draw()
+    if not crop:
+        return Image.frombuffer('RGBA', canvas.get_width_height(), canvas.buffer_rgba(), 'raw', 'RGBA', 0, 1).copy()
+
+    bbox = fig.get_tightbbox(canvas.get_renderer()).padded(TIGHT_PAD_INCHES)
+    width, height = canvas.get_width_height()
+    left = math.floor(bbox.x0 * dpi)
+    right = math.ceil(bbox.x1 * dpi)
+    top = height - math.ceil(bbox.y1 * dpi)
+    bottom = height - math.floor(bbox.y0 * dpi)
+
+    image = Image.frombuffer('RGBA', (width, height), canvas.buffer_rgba(), 'raw', 'RGBA', 0, 1)
+    if left >= 0 and top >= 0 and right <= width and bottom <= height:
+        return image.crop((left, top, right, bottom))
+    # 図の外にはみ出した内容は描画されないので、背景色で余白を補う
+    cropped = Image.new('RGBA', (right - left, bottom - top), facecolor)
+    cropped.paste(image, (-left, -top))
+    return cropped
+
+
+def _write_if_changed(path, data):
+    """内容が変わったときだけ書き込む。書き込んだら True"""
+    if path.exists() and path.read_bytes() == data:
+        return False
+    atomic_write(path, data)
+    return True
+
+
+def _smaller_formats(formats, encoded):
+    """原寸で、ロスレスの形式（PNG / WebP）のどれよりも小さくならない AVIF は出力しない
+
+    AVIF は非可逆なので、大きいうえに画質も落ちる場合は残す理由が無い。
+    判定は原寸で行い、縮小版も同じ形式の組にそろえる（srcset が形式ごとにすべての幅を持つように）。
+    """
+    if 'avif' not in formats:
+        return formats
+    avif_bytes = len(encoded['avif'][0])
+    if all(avif_bytes < len(encoded[fmt][0]) for fmt in formats if fmt != 'avif'):
+        return formats
+    return [fmt for fmt in formats if fmt != 'avif']
+
+
+def _smaller_sizes(output_path, sizes, encoded, formats):
+    """縮小版のうち、どの形式でも1つ上の幅（残した縮小版か原寸）よりファイルが小さいものだけを返す
+
+    減色の効き方によっては、縮小版（再サンプリングで中間色が増える）の方が原寸より大きくなる。
+    そのような幅は srcset に載せても転送量が増えるだけなので出力しない。
+    """
+    kept = []
+    larger = output_path
+    for path in sorted(sizes, key=lambda p: _size_width(p), reverse=True):
+        if all(len(encoded[path][fmt][0]) < len(encoded[larger][fmt][0]) for fmt in formats):
+            kept.append(path)
+            larger = path
+    return kept
+
+
+def _size_width(path):
+    return int(re.fullmatch(r'.*-(\d+)w', path.stem).group(1))
+
+
+def _remove_stale_variants(output_path, emitted):
+    """今回出力しなかったファイル（以前の実行の WebP / AVIF / SVG と縮小版）を消し、消したパスを返す"""
+    removed = []
+    size_name = re.compile(re.escape(output_path.stem) + r'-\d+w\.(?:png|webp|avif)')
+    for candidate in output_path.parent.glob(f'{output_path.stem}-*w.*'):
+        if size_name.fullmatch(candidate.name) and candidate.with_suffix('.png') not in emitted:
+            candidate.unlink()
+            removed.append(candidate)
+    for path, fmts in emitted.items():
+        for fmt in VARIANT_FORMATS:
+            stale = path.with_suffix(f'.{fmt}')
+            if fmt not in fmts and stale.is_file():
+                stale.unlink()
+                removed.append(stale)
+    return removed
+
+
+def save_figure(fig, output_path, dpi=150, close=True, crop=True):
+    """図を各形式・各幅で保存して閉じる。内容が変わっていないファイルには触れない
+
+    output_path は PNG のパス。WebP / AVIF は同じ場所に拡張子違いで、
+    縮小版は x-480w.png のような名前で出力する。SVG は x.svg。
+    close=False なら図を閉じない（figure_template のテンプレートを使い回すため）。
+    crop=False なら内容部分を切り抜かず、図全体をそのまま保存する（図の大きさを中身に合わせてある場合）。
+    """
+    with image_metrics.phase('draw'):
+        # 決まった余白で配置した図は、描画後に内容の範囲を計算して切り抜かない
+        crop = crop and not _uses_fixed_layout(fig)
+        image = render_rgba(fig, dpi, crop=crop)
+        svg = render_svg(fig, pad_inches=TIGHT_PAD_INCHES, crop=crop) if _options['svg'] else None
+    image_metrics.record_figure(fig, output_path, image.size)
+    _inspect(fig, output_path, crop)
+    if close:
+        close_figure(fig)
+    if _options['render_only']:
+        return False
+
+    root = Path(_options['output_root'] or ROOT_DIR)
+    output_path = root / output_path
+    formats = ['png'] + [f for f in _options['formats'] if f != 'png']
+    with image_metrics.phase('encode'):
+        renditions = {output_path: image}
+        for width in sorted(_options['widths']):
+            if width <= image.width * MAX_SIZE_RATIO:
+                renditions[size_variant_path(output_path, width)] = resize(image, width)
+
+        tasks = {path: (encode_formats, rendition, formats, _options['optimize'], _options['max_error'])
+                 for path, rendition in renditions.items()}
+        if _options['optimize']:
+            tasks['baseline'] = (encode_baseline_png, image)
+
+        # Pillow はエンコード中に GIL を解放するので、幅ごとにスレッドで並列化できる
+        # （減色は幅ごとに1回で、PNG と WebP が共用する）
+        with ThreadPoolExecutor(max_workers=min(len(tasks), ENCODE_THREADS)) as pool:
+            futures = {name: pool.submit(*task) for name, task in tasks.items()}
+            encoded = {name: future.result() for name, future in futures.items()}
+
+    formats = _smaller_formats(formats, encoded[output_path])
+    sizes = _smaller_sizes(output_path, [path for path in renditions if path != output_path], encoded, formats)
+    renditions = {path: rendition for path, rendition in renditions.items() if path == output_path or path in sizes}
+
+    changed = []
+    # 書き出したファイル {PNG のパス: [PNG 以外の形式]}
+    emitted = {path: [fmt for fmt in formats if fmt != 'png'] for path in renditions}
+    with image_metrics.phase('write'):
+        for path in renditions:
+            for fmt in formats:
+                if _write_if_changed(path.with_suffix(f'.{fmt}'), encoded[path][fmt][0]):
+                    changed.append((path, fmt))
+        if svg is not None:
+            svg_data, font_bytes = svg
+            emitted[output_path].append('svg')
+            if _write_if_changed(output_path.with_suffix('.svg'), svg_data):
+                changed.append((output_path, 'svg'))
+        removed = _remove_stale_variants(output_path, emitted) if _options['prune'] else []
+
+    png_data, png_info = encoded[output_path]['png']
+    stats = dict(png_info)
+    if 'baseline' in encoded:
+        stats['raw_bytes'] = len(encoded['baseline'])
+    if svg is not None:
+        stats['svg_font_bytes'] = font_bytes
+    info = describe(output_path, png_data, root=root, emitted=emitted)
+    _saved_outputs().append(dict(info, stats=stats))
+
+    if changed or removed:
+        changed_formats = [fmt for fmt in formats + ['svg'] if fmt in {f for _, f in changed}]
+        widths = [f'{size["width"]}w' for size in info.get('sizes', [])]
+        parts = []
+        if changed_formats:
+            parts.append(', '.join(changed_formats) + (f" / {', '.join(widths)}" if widths else ''))
+        if removed:
+            parts.append('削除: ' + ', '.join(path.name for path in removed))
+        print(f"✓ {info['path']}（{'、'.join(parts)}）")
+    else:
+        print(f"= {info['path']}（変更なし）")
+    return bool(changed or removed)
+
+
+def save_fixed_figure(fig, output_path, dpi=150):
+    """OG 画像など、ピクセルサイズが決まっている図を切り抜かずに PNG で保存する
+
+    save_figure と違って図は閉じない（テンプレートの図を使い回すため）。
+    WebP / AVIF・縮小版は作らない。
+    """
+    with image_metrics.phase('draw'):
+        image = render_rgba(fig, dpi, facecolor=fig.get_facecolor(), crop=False)
+    image_metrics.record_figure(fig, output_path, image.size)
+    _inspect(fig, output_path, False)
+    if _options['render_only']:
+        return False
+
+    root = Path(_options['output_root'] or ROOT_DIR)
+    output_path = root / output_path
+    with image_metrics.phase('encode'):
+        data, png_info = encode_formats(image, ['png'], _options['optimize'], _options['max_error'])['png']
+    with image_metrics.phase('write'):
+        changed = _write_if_changed(output_path, data)
+
+    info = describe(output_path, data, sizes=False, root=root, emitted={output_path: []})
+    _saved_outputs().append(dict(info, stats=dict(png_info)))
+    if changed:
+        print(f"✓ {info['path']}")
+    return changed
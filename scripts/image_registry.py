@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+画像生成関数の一覧（レジストリ）
+- generate_*.py の引数なしの create_* 関数と、定義ファイル（checklists/*.json など）1件ごとの
+  ジョブを、スクリプトを import せずに AST 解析で列挙する
+- ジョブごとに 名前・出力パス・入力ファイル・カテゴリ を持つ
+- 解析結果は image_cache のキャッシュキー計算と共有する（1つのスクリプトは1回だけ解析）
+
+matplotlib・numpy・Pillow は読み込まないので、一覧表示・絞り込み・キャッシュ判定だけなら
+数十ミリ秒で終わる。重い import は、ワーカーが生成関数を実行するときに初めて行われる。
+
+使い方（リポジトリ直下で実行）:
+    python scripts/image_registry.py              # すべての生成関数を JSON で表示
+    python scripts/image_registry.py checklist    # 名前に "checklist" を含むものだけ
+"""
+import ast
+import json
+import sys
+from collections import namedtuple
+from pathlib import Path
+
+import image_cache
+from image_cache import ROOT_DIR, SCRIPTS_DIR
+
+# 一括実行の対象スクリプト（旧版・修正前のスクリプトは含めない）
+GENERATOR_SCRIPTS = [
+    'generate_graphs_fixed',
+    'generate_flowcharts',
+    'generate_checklists_fixed',
+    'generate_comparison_tables_fixed',
+    'generate_bgm_image',
+]
+
+# 定義ファイル1件につき1ジョブとなる生成関数（スクリプト, 関数, 定義ファイルの glob）
+SPEC_GENERATORS = [
+    ('generate_checklists_fixed', 'create_checklist_from_spec', 'checklists/*.json'),
+]
+
+# spec は定義ファイルのパス（リポジトリ直下からの相対パス）。関数単体のジョブでは None
+# outputs はソースから読み取った出力パス、category は出力先のカテゴリ（public/<カテゴリ>/images）
+# inputs はソース以外に出力が依存するファイル（定義ファイル）
+Job = namedtuple('Job', ['module', 'function', 'doc', 'spec', 'outputs', 'category', 'inputs'],
+                 defaults=(None, (), None, ()))
+
+
+def discover_jobs(scripts=GENERATOR_SCRIPTS, spec_generators=SPEC_GENERATORS):
+    """スクリプトを import せずに（AST解析で）引数なしの create_* 関数と定義ファイルを列挙"""
+    jobs = []
+    for module in scripts:
+        for node in image_cache.index_module(module)['functions'].values():
+            if not node.name.startswith('create_'):
+                continue
+            # create_checklist などの引数を取る共通関数は対象外
+            args = node.args
+            if len(args.args) > len(args.defaults) or args.vararg or args.kwarg:
+                continue
+            doc = (ast.get_docstring(node) or '').splitlines()
+            outputs = _literal_outputs(node)
+            jobs.append(Job(module, node.name, doc[0] if doc else '', outputs=outputs,
+                            category=output_category(outputs)))
+
+    for module, function, pattern in spec_generators:
+        for spec_path in sorted(SCRIPTS_DIR.glob(pattern)):
+            spec = json.loads(spec_path.read_text(encoding='utf-8'))
+            outputs = (spec['output'],) if 'output' in spec else ()
+            spec_file = str(spec_path.relative_to(ROOT_DIR))
+            jobs.append(Job(module, function, spec.get('title', ''), spec_file, outputs,
+                            output_category(outputs), (spec_file,)))
+    return jobs
+
+
+def _literal_outputs(node):
+    """関数内に書かれた画像パスの文字列リテラル（'content/xxx/images/yyy.png' など）"""
+    return tuple(child.value for child in ast.walk(node)
+                 if isinstance(child, ast.Constant) and isinstance(child.value, str)
+                 and child.value.endswith('.png') and '/images/' in child.value)
+
+
+def image_key(path):
+    """'<カテゴリ>/images/<ファイル名>' の形の照合キー（content/ と public/ の違いを吸収）"""
+    parts = Path(path).parts
+    return '/'.join(parts[-3:])
+
+
+def output_category(outputs):
+    """出力パスのカテゴリ（mild-response など）。出力パスが分からなければ None"""
+    return image_key(outputs[0]).split('/')[0] if outputs else None
+
+
+def job_label(job):
+    """表示用のジョブ名"""
+    if job.spec:
+        return f'{job.module}.{job.function}({Path(job.spec).name})'
+    return f'{job.module}.{job.function}'
+
+
+def filter_jobs(jobs, patterns):
+    """名前に指定文字列のいずれかを含むジョブだけに絞り込む"""
+    if not patterns:
+        return jobs
+    return [job for job in jobs if any(p in job_label(job) for p in patterns)]
+
+
+def describe_job(job):
+    """ジョブの説明（JSON に書ける形）"""
+    return {
+        'name': job_label(job),
+        'module': job.module,
+        'function': job.function,
+        'doc': job.doc,
+        'category': job.category,
+        'outputs': list(job.outputs),
+        'inputs': list(job.inputs),
+    }
+
+
+if __name__ == '__main__':
+    jobs = filter_jobs(discover_jobs(), sys.argv[1:])
+    print(json.dumps([describe_job(job) for job in jobs], ensure_ascii=False, indent=2))
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+生成画像の SVG 出力（--svg 指定時のみ）
+- 文字はパスに変換せず <text> のまま出力（svg.fonttype = 'none'）
+- SVG 内で実際に使われている文字だけを含むサブセットフォントを作り、
+  WOFF2 の @font-face として埋め込む（閲覧側に IPAexGothic 等が無くても同じ字形で表示）
+  ファイルサイズはフォント全体ではなく使った文字数に比例する
+- font-family のフォールバック（IPAexGothic に無い ≤ ≥ などは DejaVu Sans）も含め、
+  文字ごとに実際に描画するフォントを決めて、フォントごとにサブセットを埋め込む
+- brotli が無い環境では WOFF2 を作れないので WOFF（zlib 圧縮）で埋め込む
+- 日付を埋め込まず ID のソルトも固定するので、同じ図からは同じバイト列になる
+
+フォントのサブセット化には fontTools（matplotlib の依存パッケージ）を使う。
+"""
+import base64
+import io
+import re
+import xml.etree.ElementTree as ET
+from functools import lru_cache
+
+import matplotlib
+from matplotlib import font_manager
+
+# ID 生成に使うソルト（既定では乱数になり、毎回ファイルが変わる）
+SVG_HASH_SALT = 'review-safety'
+
+FONT_MIME_TYPES = {'woff2': 'font/woff2', 'woff': 'font/woff'}
+
+
+def font_flavor():
+    """埋め込むフォント形式。WOFF2 には brotli が必要"""
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        return 'woff'
+    return 'woff2'
+
+
+def _parse_style(style):
+    """style 属性（"font-size: 10px; font-family: 'IPAexGothic'"）を辞書に"""
+    declarations = {}
+    for declaration in style.split(';'):
+        key, sep, value = declaration.partition(':')
+        if sep:
+            declarations[key.strip()] = value.strip()
+    return declarations
+
+
+def used_characters(svg_data):
+    """SVG の <text> で使われている文字を (フォント名のタプル, ウェイト) ごとに集める
+
+    フォント名のタプルは font-family に書かれたフォールバックの順。
+    """
+    used = {}
+    for element in ET.fromstring(svg_data).iter():
+        if not element.tag.endswith('}text'):
+            continue
+        style = _parse_style(element.get('style', ''))
+        if 'font-family' not in style:
+            continue
+        families = tuple(name.strip().strip('\'"') for name in style['font-family'].split(','))
+        weight = int(style.get('font-weight', 400))
+        used.setdefault((families, weight), set()).update(''.join(element.itertext()))
+    return used
+
+
+@lru_cache(maxsize=None)
+def _font_characters(font_path):
+    """フォントファイルに字形がある文字のコードポイント"""
+    from fontTools.ttLib import TTFont
+
+    with TTFont(font_path, fontNumber=0, lazy=True) as font:
+        return frozenset(font.getBestCmap() or ())
+
+
+def _find_font(family, weight):
+    try:
+        return font_manager.findfont(font_manager.FontProperties(family=family, weight=weight),
+                                     fallback_to_default=False)
+    except ValueError:
+        return None
+
+
+def assign_fonts(used):
+    """文字ごとに、フォールバックの順で最初に字形を持つフォントを割り当てる
+
+    戻り値は {(フォント名, フォントファイル): {'weights': ウェイトの集合, 'characters': 文字の集合}}。
+    どのフォントにも無い文字は、先頭のフォント（matplotlib が豆腐を描くフォント）に入れる。
+    """
+    faces = {}
+    for (families, weight), characters in used.items():
+        fonts = [(family, path) for family in families
+                 if (path := _find_font(family, weight)) is not None]
+        if not fonts:
+            continue
+        for char in characters:
+            font = next((font for font in fonts if ord(char) in _font_characters(font[1])), fonts[0])
+            face = faces.setdefault(font, {'weights': set(), 'characters': set()})
+            face['weights'].add(weight)
+            face['characters'].add(char)
+    return faces
+
+
+def subset_font(font_path, characters, flavor):
+    """フォントファイルから指定文字だけを含むサブセットを作る"""
+    from fontTools import subset
+
+    options = subset.Options()
+    options.flavor = flavor
+    options.hinting = False
+    options.desubroutinize = True
+    # DejaVu Sans の FFTM（FontForge のタイムスタンプ）はサブセット化できず警告が出るので落とす
+    options.drop_tables += ['FFTM']
+    if str(font_path).lower().endswith('.ttc'):
+        options.font_number = 0
+    font = subset.load_font(font_path, options, dontLoadGlyphNames=True)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(text=''.join(sorted(characters)))
+    subsetter.subset(font)
+    buffer = io.BytesIO()
+    subset.save_font(font, buffer, options)
+    return buffer.getvalue()
+
+
+def font_face_css(used):
+    """使われている文字から @font-face の CSS を作る。戻り値は (CSS, 埋め込んだフォントのバイト数)"""
+    flavor = font_flavor()
+    # 同じフォントファイルが複数のウェイトに使われる場合（太字の無い IPAexGothic など）は1回だけ埋め込む
+    faces = assign_fonts(used)
+
+    rules = []
+    total = 0
+    for (family, path), face in sorted(faces.items()):
+        data = subset_font(path, face['characters'], flavor)
+        total += len(data)
+        weights = sorted(face['weights'])
+        weight = str(weights[0]) if len(weights) == 1 else f'{weights[0]} {weights[-1]}'
+        encoded = base64.b64encode(data).decode('ascii')
+        rules.append(f"@font-face{{font-family:'{family}';font-weight:{weight};"
+                     f"src:url(data:{FONT_MIME_TYPES[flavor]};base64,{encoded}) format('{flavor}')}}")
+    return ''.join(rules), total
+
+
+def embed_fonts(svg_data):
+    """SVG の <style> にサブセットフォントの @font-face を追加する"""
+    css, font_bytes = font_face_css(used_characters(svg_data))
+    if not css:
+        return svg_data, 0
+    text = svg_data.decode('utf-8')
+    style_tag = '<style type="text/css">'
+    if style_tag in text:
+        text = text.replace(style_tag, style_tag + css, 1)
+    else:
+        text = re.sub(r'(<svg\b[^>]*>)', lambda m: f'{m.group(1)}<defs>{style_tag}{css}</style></defs>', text, count=1)
+    return text.encode('utf-8'), font_bytes
+
+
+def render_svg(fig, pad_inches=0.1, facecolor='white', crop=True):
+    """図を文字付きの SVG にする。戻り値は (SVG のバイト列, 埋め込んだフォントのバイト数)
+
+    crop=False なら内容部分に切り詰めず、図全体を出力する。
+    """
+    buffer = io.BytesIO()
+    bbox = {'bbox_inches': 'tight', 'pad_inches': pad_inches} if crop else {}
+    with matplotlib.rc_context({'svg.fonttype': 'none', 'svg.hashsalt': SVG_HASH_SALT}):
+        fig.savefig(buffer, format='svg', facecolor=facecolor, metadata={'Date': None}, **bbox)
+    return embed_fonts(buffer.getvalue())
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+常駐型の画像レンダリングサーバー
+- matplotlib・日本語フォント・生成スクリプトを起動時に1回だけ読み込み、以降の描画要求を
+  読み込み済みのプロセスで処理する（1枚あたり数十ミリ秒〜）
+- 標準入出力の JSON Lines（既定）または Unix ソケット（--socket）で要求を受け付ける
+- 要求は1件ずつ順番に処理する（matplotlib の状態はスレッドセーフではないため）
+
+要求（1行1件の JSON）:
+    {"id": 1, "generator": "checklist", "data": {...checklists/*.json と同じ形式...}}
+    {"id": 2, "generator": "table", "data": {"title": ..., "headers": [...], "rows": [[...]]},
+     "output": "public/bridge/images/x.png"}
+    {"id": 3, "generator": "create_crisis_level_matrix"}      # build_images.py の生成関数名
+    {"id": 4, "command": "list"}                                # 使える generator の一覧
+    {"command": "shutdown"}
+
+応答:
+    {"id": 1, "ok": true, "elapsed": 0.08, "outputs": [{"path", "bytes", "width", "height", "sha256"}],
+     "png_base64": "..."}                                       # "inline": true または output 省略時
+    {"id": 1, "ok": false, "error": "..."}
+
+output を省略したデータ指定の要求は一時ディレクトリに描画し、PNG を応答に含める。
+データ指定の要求は --formats / --widths / --optimize の出力設定で描画する。生成関数の要求は
+build_images.py を既定の引数で実行したときと同じ出力設定（全形式・縮小版・減色）で描画し、
+ビルドが出力したファイルを PNG だけの未最適化版で置き換えたり消したりしない。
+public/ に書き出した場合は、build_images.py と同じく data/image-manifest.json を更新し、
+生成関数の要求ならビルドキャッシュにも登録する（次の build_images.py で作り直さない）。
+生成関数が表示する「✓ 保存」などのログは応答の "log" に、起動時の警告は標準エラー出力に出す
+（標準出力は応答専用）。
+
+使い方（リポジトリ直下で実行）:
+    python scripts/render_server.py                           # 標準入出力
+    python scripts/render_server.py --socket .cache/render.sock
+"""
+import argparse
+import base64
+import contextlib
+import io
+import json
+import os
+import socketserver
+import sys
+import tempfile
+import time
+import traceback
+from pathlib import Path
+
+import image_cache
+import image_manifest
+from build_images import (DEFAULT_TIMEOUT, ROOT_DIR, _init_worker, _load_module, _run_job, build_output_options,
+                          parse_widths, resolve_formats)
+from image_registry import discover_jobs, job_label
+
+
+def _render_checklist(module, data, output_path):
+    module.create_checklist(data['title'], data.get('subtitle'), data['categories'],
+                            output_path, data.get('note'), data.get('style'))
+
+
+def _render_table(module, data, output_path):
+    module.create_table_image(data['title'], data['headers'], data['rows'],
+                              output_path, data.get('col_widths'))
+
+
+# データを受け取って描画する generator（名前: (スクリプト, 描画関数)）
+DATA_GENERATORS = {
+    'checklist': ('generate_checklists_fixed', _render_checklist),
+    'table': ('generate_comparison_tables_fixed', _render_table),
+}
+
+
+class RenderError(Exception):
+    """要求の内容に問題がある（トレースバックは返さない）"""
+
+
+class RenderServer:
+    """読み込み済みの状態を保持して描画要求を処理する"""
+
+    def __init__(self, output_options, job_options):
+        # output_options はデータ指定の要求、job_options は生成関数の要求の出力設定
+        self.output_options = output_options
+        self.job_options = job_options
+        _init_worker(output_options)
+        import image_output
+        self.image_output = image_output
+        self.jobs = {}
+        for job in discover_jobs():
+            self.jobs[job_label(job)] = job
+            if job.spec is None:
+                self.jobs.setdefault(job.function, job)
+        for module, _ in DATA_GENERATORS.values():
+            _load_module(module)
+
+    def generator_names(self):
+        return sorted(DATA_GENERATORS) + sorted(label for label in self.jobs if '.' in label)
+
+    def handle(self, request):
+        """1件の要求を処理して応答を返す"""
+        command = request.get('command', 'render')
+        if command == 'ping':
+            return {'ok': True}
+        if command == 'list':
+            return {'ok': True, 'generators': self.generator_names()}
+        if command != 'render':
+            return {'ok': False, 'error': f'不明な command: {command}'}
+
+        name = request.get('generator')
+        start = time.perf_counter()
+        log = io.StringIO()
+        job = None
+        try:
+            with tempfile.TemporaryDirectory(prefix='render-') as tmp_root, contextlib.redirect_stdout(log):
+                inline = request.get('inline', False)
+                if name in DATA_GENERATORS:
+                    if 'output' not in request:
+                        # 出力先の指定がなければ一時ディレクトリに描画して PNG を返す
+                        self.image_output.configure(output_root=tmp_root)
+                        inline = True
+                    outputs = self._render_data(name, request.get('data') or {},
+                                                Path(request.get('output', f'{name}.png')))
+                elif name in self.jobs:
+                    job = self.jobs[name]
+                    self.image_output.configure(**self.job_options)
+                    try:
+                        ok, _, error, outputs, _ = _run_job(job, DEFAULT_TIMEOUT)
+                    finally:
+                        self.image_output.configure(**self.output_options)
+                    if not ok:
+                        raise RenderError(error.splitlines()[0])
+                else:
+                    raise RenderError(f'不明な generator: {name}')
+                output_root = self.image_output.output_options()['output_root']
+                if output_root is None:
+                    self._record_outputs(outputs, job)
+                root = Path(output_root or ROOT_DIR)
+                response = {
+                    'ok': True,
+                    'elapsed': round(time.perf_counter() - start, 4),
+                    'outputs': [{k: info[k] for k in ('path', 'bytes', 'width', 'height', 'sha256')}
+                                for info in outputs],
+                }
+                if inline and outputs:
+                    response['png_base64'] = base64.b64encode((root / outputs[0]['path']).read_bytes()).decode()
+        except Exception as e:
+            response = {'ok': False, 'elapsed': round(time.perf_counter() - start, 4),
+                        'error': f'{type(e).__name__}: {e}'}
+            if not isinstance(e, RenderError):
+                response['traceback'] = traceback.format_exc()
+        finally:
+            self.image_output.configure(output_root=None)
+        if log.getvalue():
+            response['log'] = log.getvalue().splitlines()
+        return response
+
+    def _record_outputs(self, outputs, job=None):
+        """リポジトリ内に書き出した画像をマニフェスト（と生成関数ならビルドキャッシュ）に反映する"""
+        public = [info for info in outputs
+                  if (ROOT_DIR / info['path']).resolve().is_relative_to(image_manifest.PUBLIC_DIR)]
+        if public:
+            images = image_manifest.load_manifest()
+            image_manifest.update_manifest(images, public)
+            image_manifest.save_manifest(images)
+        if job is not None and outputs:
+            entries = image_cache.load_cache()
+            key = image_cache.job_key(job.module, job.function, job.spec, self.job_options)
+            files = [path for info in outputs for path in image_manifest.output_files(info)]
+            image_cache.record(entries, job_label(job), key, files)
+            image_cache.save_cache(entries)
+
+    def _render_data(self, name, data, output_path):
+        """データ指定の generator を、そのスクリプトの rcParams で実行"""
+        import matplotlib
+
+        module_name, render = DATA_GENERATORS[name]
+        module, rc = _load_module(module_name)
+        self.image_output.pop_saved_outputs()
+        try:
+            with matplotlib.rc_context():
+                dict.update(matplotlib.rcParams, rc)
+                render(module, data, output_path)
+        finally:
+            self.image_output.close_all_figures()
+        return self.image_output.pop_saved_outputs()
+
+
+def _handle_line(server, line):
+    """JSON 1行を処理して応答の JSON 1行を返す。shutdown なら None"""
+    try:
+        request = json.loads(line)
+    except json.JSONDecodeError as e:
+        return json.dumps({'ok': False, 'error': f'JSON の形式が不正です: {e}'}, ensure_ascii=False)
+    if request.get('command') == 'shutdown':
+        return None
+    response = server.handle(request)
+    if 'id' in request:
+        response = {'id': request['id'], **response}
+    return json.dumps(response, ensure_ascii=False)
+
+
+def serve_stdio(server):
+    """標準入力から1行ずつ要求を読み、標準出力に応答を書く"""
+    out = sys.stdout
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        reply = _handle_line(server, line)
+        if reply is None:
+            break
+        out.write(reply + '\n')
+        out.flush()
+
+
+def serve_socket(server, socket_path):
+    """Unix ソケットで待ち受け、接続ごとに JSON Lines で要求を処理する"""
+    socket_path = Path(socket_path)
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    if socket_path.exists():
+        socket_path.unlink()
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                if not line.strip():
+                    continue
+                reply = _handle_line(server, line.decode('utf-8'))
+                if reply is None:
+                    self.server.shutdown_requested = True
+                    break
+                self.wfile.write((reply + '\n').encode('utf-8'))
+                self.wfile.flush()
+
+    with socketserver.UnixStreamServer(str(socket_path), Handler) as unix_server:
+        unix_server.shutdown_requested = False
+        try:
+            while not unix_server.shutdown_requested:
+                unix_server.handle_request()
+        finally:
+            socket_path.unlink(missing_ok=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='matplotlib を読み込んだまま描画要求を処理する常駐サーバー')
+    parser.add_argument('--socket', help='Unix ソケットのパス（省略時は標準入出力の JSON Lines）')
+    parser.add_argument('--formats', default='png', help='データ指定の要求の出力形式（カンマ区切り、既定: png）')
+    parser.add_argument('--widths', type=parse_widths, default=[],
+                        help='データ指定の要求のレスポンシブ版の幅（px、カンマ区切り。既定: 出力しない）')
+    parser.add_argument('--optimize', action='store_true',
+                        help='データ指定の要求でも PNG の減色・再圧縮を行う（遅くなる）')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    # 標準入出力モードでは標準出力が応答専用なので、起動時の警告（未対応の形式など）は標準エラー出力へ
+    with contextlib.redirect_stdout(sys.stderr):
+        output_options = {'formats': resolve_formats(args.formats), 'widths': args.widths,
+                          'optimize': args.optimize}
+        server = RenderServer(output_options, build_output_options())
+    where = args.socket or '標準入出力'
+    print(f'レンダリングサーバー起動（{time.perf_counter() - start:.2f}秒、{where}、pid {os.getpid()}）',
+          file=sys.stderr, flush=True)
+
+    if args.socket:
+        serve_socket(server, args.socket)
+    else:
+        serve_stdio(server)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
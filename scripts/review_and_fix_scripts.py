@@ -15,16 +15,21 @@
 4. wrap=Trueの適切な使用
 """
 
+import sys
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 from matplotlib.patches import FancyBboxPatch, Rectangle
-import japanize_matplotlib
 from pathlib import Path
 import numpy as np
 import textwrap
 
+from check_images import check_jobs, count_issues, print_results
+from figure_template import patch_collection
+from image_fonts import setup_fonts
+from image_registry import discover_jobs
+
 # 日本語フォント設定（改善版）
-plt.rcParams['font.sans-serif'] = ['Hiragino Sans', 'Yu Gothic', 'Meirio', 'Takao', 'IPAexGothic', 'IPAPGothic']
+setup_fonts()
 plt.rcParams['font.size'] = 9
 plt.rcParams['axes.unicode_minus'] = False  # マイナス記号の文字化け防止
 
@@ -57,13 +62,16 @@ def create_table_with_proper_spacing(title, headers, rows, output_path, col_widt
     table_top = 0.90
     row_height = min(0.08, 0.7 / (num_rows + 1))  # 行の高さを調整
 
+    # セルの枠は PatchCollection にまとめて描画（セル数によらず描画呼び出しはヘッダー・データの2回）
+    header_boxes = []
+    cell_boxes = []
+
     # ヘッダー行
     x_pos = 0.05
     for i, (header, width) in enumerate(zip(headers, col_widths)):
         # ヘッダーセル
-        header_box = Rectangle((x_pos, table_top - row_height), width * 0.88, row_height,
-                               edgecolor='black', facecolor='#1976D2', linewidth=1.5)
-        ax.add_patch(header_box)
+        header_boxes.append(Rectangle((x_pos, table_top - row_height), width * 0.88, row_height,
+                                      edgecolor='black', facecolor='#1976D2', linewidth=1.5))
 
         # ヘッダーテキスト（改行対応）
         wrapped_header = wrap_text(header, width=15)
@@ -82,9 +90,8 @@ def create_table_with_proper_spacing(title, headers, rows, output_path, col_widt
 
         for col_idx, (cell_data, width) in enumerate(zip(row_data, col_widths)):
             # セル
-            cell_box = Rectangle((x_pos, y_pos), width * 0.88, row_height,
-                                edgecolor='#BDBDBD', facecolor=bg_color, linewidth=1)
-            ax.add_patch(cell_box)
+            cell_boxes.append(Rectangle((x_pos, y_pos), width * 0.88, row_height,
+                                        edgecolor='#BDBDBD', facecolor=bg_color, linewidth=1))
 
             # セルテキスト（改行対応、フォントサイズ縮小）
             wrapped_text = wrap_text(str(cell_data), width=int(width * 40))
@@ -92,6 +99,9 @@ def create_table_with_proper_spacing(title, headers, rows, output_path, col_widt
                    wrapped_text, ha='center', va='center', fontsize=8)
             x_pos += width * 0.9
 
+    patch_collection(ax, header_boxes)
+    patch_collection(ax, cell_boxes)
+
     plt.tight_layout(pad=1.5)
     plt.savefig(output_path, dpi=150, bbox_inches='tight', facecolor='white')
     plt.close()
@@ -99,36 +109,23 @@ def create_table_with_proper_spacing(title, headers, rows, output_path, col_widt
 
 
 def main():
-    """レビュー結果の表示"""
+    """レビュー結果の表示（問題点は生成画像の重なり・はみ出しを実際に検査して表示）"""
     print("=" * 60)
     print("画像生成スクリプトのレビュー結果")
     print("=" * 60)
     print()
 
-    print("【検出された問題点】")
-    print()
-
-    print("1. フローチャート (generate_flowcharts.py)")
-    print("   ✗ テキストの重なり: 小さいフォントサイズでテキストが密集")
-    print("   ✗ ボックスサイズ: テキストに対してボックスが小さい")
-    print("   ✗ 余白不足: 要素間の余白が不十分")
-    print()
-
-    print("2. 比較表 (generate_comparison_tables.py)")
-    print("   ✗ テーブルセル: 長いテキストがはみ出す")
-    print("   ✗ 改行処理: テキストの自動改行が機能していない")
-    print("   ✗ フォントサイズ: セル内のテキストが読みにくい")
+    print("【検出された問題点】（check_images.py による自動検出）")
     print()
 
-    print("3. グラフ (generate_graphs.py)")
-    print("   ✗ 軸ラベル: 日本語ラベルの配置がずれる")
-    print("   ✗ 凡例: 凡例が重なる、または見切れる")
-    print("   ✗ マイナス記号: 文字化けする可能性")
+    results = check_jobs(discover_jobs())
+    print_results(results)
+    counts = count_issues(results)
     print()
-
-    print("4. チェックリスト (generate_checklists.py)")
-    print("   ✗ 項目の重なり: チェック項目が多いと重なる")
-    print("   ✗ 動的サイズ調整: 図のサイズが固定されている")
+    if any(counts.values()):
+        print(f"重なり: {counts['overlap']}件 / はみ出し: {counts['overflow']}件 / 図の外: {counts['clipped']}件")
+    else:
+        print("重なり・はみ出しは見つかりませんでした")
     print()
 
     print("=" * 60)
@@ -170,7 +167,8 @@ def main():
     print("=" * 60)
     print("修正版スクリプトを生成します...")
     print("=" * 60)
+    return 1 if any(counts.values()) or not all(r['ok'] for r in results) else 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+文字列の寸法（幅・高さ・ディセント）の永続キャッシュ
+- matplotlib は文字列の寸法を FreeType で測る（FT2Font.set_text でグリフを読み込んで配置する）。
+  matplotlib 内部のキャッシュは描画器（Renderer）ごとなので、図を描画するたびに
+  「【対応】」や表の見出しのような同じ文字列を測り直している
+- ここでは Agg の描画器の get_text_width_height_descent を差し替え、
+  (文字列, フォントファイル, サイズ, 太さ, dpi など) をキーに結果を使い回す
+- 結果は .cache/text-metrics.json に保存し、次の実行・別の図・別のワーカーでも使う
+  （matplotlib のバージョンかフォントが変わったら捨てる）
+- 保存は新しく測った文字列があるときだけ。ワーカーどうしが同時に保存すると一部が失われることがあるが、
+  次の実行で測り直すだけで結果は変わらない
+- 読み込み・保存はロックで囲むので、複数のスレッドの描画器から同時に使える
+
+image_output が描画・tight_layout の前に install(renderer) を呼ぶ。
+build_images.py のワーカーはジョブごとに、単体で実行したスクリプトは終了時に save() する。
+"""
+import atexit
+import json
+import threading
+
+import matplotlib
+from matplotlib import font_manager
+
+import image_fonts
+from image_manifest import ROOT_DIR, atomic_write
+
+METRICS_PATH = ROOT_DIR / '.cache' / 'text-metrics.json'
+METRICS_VERSION = 1
+
+# 保存する件数の上限（超えたら古いものから捨てる）
+MAX_ENTRIES = 50000
+
+# キー → [幅, 高さ, ディセント]（ピクセル）。None は未読み込み
+_entries = None
+_environment = None
+# このプロセスで新しく測った文字列
+_added = {}
+# 読み込み・保存の排他（build_images.py --threads では複数のスレッドが同時に描画・保存する）
+_lock = threading.RLock()
+
+
+def _current_environment():
+    """キャッシュ全体の有効性を判定する値（matplotlib のバージョンとフォントディレクトリ）"""
+    return {'matplotlib': matplotlib.__version__, 'fonts': image_fonts.resolution_key()['dirs']}
+
+
+def _load():
+    global _entries, _environment
+    if _entries is not None:
+        return
+    _environment = _current_environment()
+    _entries = {}
+    try:
+        data = json.loads(METRICS_PATH.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        data = {}
+    if data.get('version') == METRICS_VERSION and data.get('environment') == _environment:
+        _entries = data.get('entries', {})
+    atexit.register(save)
+
+
+def _key(text, prop, ismath, dpi):
+    rc = matplotlib.rcParams
+    return '\x1f'.join(map(str, (
+        font_manager.findfont(prop), ','.join(prop.get_family()), prop.get_size_in_points(),
+        prop.get_weight(), prop.get_style(), prop.get_variant(), prop.get_stretch(), dpi, ismath,
+        rc['text.hinting'], rc['text.hinting_factor'], rc['text.kerning_factor'], text)))
+
+
+def install(renderer):
+    """描画器の get_text_width_height_descent をキャッシュ付きに差し替える（2回目以降は何もしない）"""
+    measure = renderer.get_text_width_height_descent
+    if getattr(measure, 'cached', False):
+        return renderer
+    with _lock:
+        _load()
+
+    def cached_measure(s, prop, ismath):
+        # usetex（ismath='TeX'）は外部コマンドの結果なので対象外
+        if ismath not in (False, True):
+            return measure(s, prop, ismath)
+        key = _key(s, prop, ismath, renderer.dpi)
+        value = _entries.get(key)
+        if value is None:
+            value = list(measure(s, prop, ismath))
+            _entries[key] = _added[key] = value
+        return tuple(value)
+
+    cached_measure.cached = True
+    renderer.get_text_width_height_descent = cached_measure
+    return renderer
+
+
+def save():
+    """新しく測った文字列があれば、保存済みの内容とまとめて書き込む"""
+    with _lock:
+        _save()
+
+
+def _save():
+    # 保存中に他のスレッドが測った文字列は次の保存に回す
+    added = dict(_added)
+    if not added:
+        return
+    try:
+        data = json.loads(METRICS_PATH.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        data = {}
+    same = data.get('version') == METRICS_VERSION and data.get('environment') == _environment
+    entries = data.get('entries', {}) if same else {}
+    entries.update(added)
+    if len(entries) > MAX_ENTRIES:
+        entries = dict(list(entries.items())[-MAX_ENTRIES:])
+    text = json.dumps({'version': METRICS_VERSION, 'environment': _environment, 'entries': entries},
+                      ensure_ascii=False, separators=(',', ':'))
+    try:
+        atomic_write(METRICS_PATH, text.encode('utf-8'))
+    except OSError:
+        # 書き込めない場所でも描画は続ける
+        return
+    for key in added:
+        del _added[key]
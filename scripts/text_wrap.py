@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+日本語を含む文字列の折り返し（表のセル・チェックリストの項目用）
+- textwrap は文字数で数え、空白でしか改行しないため、全角文字（半角の約2倍の幅）が多いとはみ出す
+- ここでは実際に描画に使われるフォントの字送り幅（FT2Font）を足し合わせて、ポイント単位の幅で折り返す
+- 英数字の連続（URL・英単語・数値）は途中で切らず、幅に収まらないときだけ文字単位で分ける
+- 禁則処理: 句読点・閉じ括弧・小書きの仮名・長音符は行頭に置かず、開き括弧は行末に置かない
+- 文字ごとの幅と、文字列ごとの計測・折り返し結果はプロセス内でキャッシュする
+  （FT2Font は状態を持つので、matplotlib の get_font と同じくスレッドごとに開く）
+
+幅は描画時と同じ rcParams（font.family など）から解決したフォントで測るので、
+生成関数の中（そのスクリプトの rcParams が有効な状態）で呼ぶ。
+"""
+import re
+import threading
+from functools import lru_cache
+
+import matplotlib
+from matplotlib import font_manager
+from matplotlib.ft2font import FT2Font, LoadFlags
+
+# 行頭に来てはいけない文字
+NO_LINE_START = set('、。，．,.・：；:;？！?!ー～）)」』】〉》〕］]｝}…‥'
+                    'ぁぃぅぇぉっゃゅょゎゕゖァィゥェォッャュョヮヵヶ')
+# 行末に来てはいけない文字
+NO_LINE_END = set('（(「『【〈《〔［[｛{')
+
+# 途中で改行しない英数字の並び（空白は直前の語に含める）
+_TOKEN = re.compile(r'[A-Za-z0-9@#$%&+\-=/_.:~]+ *|.', re.S)
+
+# 字送り幅を測るときの文字サイズ（この値で測って比例計算する）
+_MEASURE_SIZE = 100
+
+
+@lru_cache(maxsize=None)
+def _load_font(path, thread_id):
+    font = FT2Font(path)
+    font.set_size(_MEASURE_SIZE, 72)
+    return font
+
+
+@lru_cache(maxsize=None)
+def _font_paths(family, weight):
+    """フォント名のリストから (主フォント, 代替フォント) のパス"""
+    primary = font_manager.findfont(font_manager.FontProperties(family=list(family), weight=weight))
+    fallback = font_manager.findfont(font_manager.FontProperties(family='DejaVu Sans', weight=weight))
+    return primary, fallback
+
+
+def _current_fonts(weight):
+    """現在の rcParams で描画したときに使われるフォント"""
+    family = []
+    for name in matplotlib.rcParams['font.family']:
+        if name in ('sans-serif', 'serif', 'monospace', 'cursive', 'fantasy'):
+            family.extend(matplotlib.rcParams[f'font.{name}'])
+        else:
+            family.append(name)
+    return _font_paths(tuple(family), weight)
+
+
+@lru_cache(maxsize=None)
+def _advance(paths, char):
+    """1文字の字送り幅（1pt あたり）。主フォントに無い文字は代替フォントで測る"""
+    for path in paths:
+        font = _load_font(path, threading.get_ident())
+        if font.get_char_index(ord(char)):
+            glyph = font.load_char(ord(char), flags=LoadFlags.NO_HINTING)
+            return glyph.linearHoriAdvance / 65536 / _MEASURE_SIZE
+    return 0.5
+
+
+@lru_cache(maxsize=4096)
+def _measure(paths, text):
+    return sum(_advance(paths, char) for char in text)
+
+
+def text_width(text, fontsize, weight='normal'):
+    """1行の文字列の幅（ポイント）"""
+    return _measure(_current_fonts(weight), text) * fontsize
+
+
+def _split_long(token, width, paths, fontsize):
+    """1行に収まらない英数字の並びを文字単位で分ける"""
+    pieces, piece = [], ''
+    for char in token:
+        if piece and _measure(paths, piece + char) * fontsize > width:
+            pieces.append(piece)
+            piece = ''
+        piece += char
+    return pieces + [piece]
+
+
+def _wrap_paragraph(text, width, paths, fontsize):
+    lines, line = [], []
+    for token in _TOKEN.findall(text):
+        if line and _measure(paths, ''.join(line + [token]).rstrip()) * fontsize > width:
+            if token[0] in NO_LINE_START and len(line) > 1:
+                # 行頭禁則: 直前の文字ごと次の行へ送る
+                carry = [line.pop()]
+            elif line[-1][-1] in NO_LINE_END and len(line) > 1:
+                # 行末禁則: 開き括弧を次の行へ送る
+                carry = [line.pop()]
+            else:
+                carry = []
+            lines.append(''.join(line).rstrip())
+            line = carry
+        if not line and _measure(paths, token.rstrip()) * fontsize > width:
+            *full, token = _split_long(token, width, paths, fontsize)
+            lines.extend(full)
+        line.append(token)
+    lines.append(''.join(line).rstrip())
+    return lines
+
+
+@lru_cache(maxsize=4096)
+def _wrap(paths, text, width, fontsize):
+    lines = []
+    for paragraph in text.split('\n'):
+        lines.extend(_wrap_paragraph(paragraph, width, paths, fontsize) if paragraph else [''])
+    return tuple(lines)
+
+
+def wrap_lines(text, width, fontsize, weight='normal'):
+    """文字列を幅 width（ポイント）に収まるよう折り返した行のリスト
+
+    もともとの改行は残し、はみ出す行だけをさらに折り返す。
+    """
+    return list(_wrap(_current_fonts(weight), str(text), width, fontsize))
+
+
+def wrap(text, width, fontsize, weight='normal'):
+    """wrap_lines の結果を改行でつないだ文字列（ax.text にそのまま渡せる）"""
+    return '\n'.join(wrap_lines(text, width, fontsize, weight))
+
+
+def points_per_unit(ax):
+    """Axes の x 方向のデータ座標 1 あたりのポイント数（図のサイズ・Axes の位置から計算）"""
+    fig_width = ax.figure.get_figwidth() * 72
+    x0, x1 = ax.get_xlim()
+    return ax.get_position().width * fig_width / (x1 - x0)